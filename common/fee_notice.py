@@ -1,8 +1,26 @@
+import re
+from functools import lru_cache
+
+_PLACEHOLDER_RE = re.compile(r'\{(발신자|전화번호|멘션|미납내역|납부문서URL)\}')
+
+
+@lru_cache(maxsize=8)
+def _compile_template(template_content):
+    """템플릿을 (리터럴, 플레이스홀더명, 리터럴, ...) 조각으로 분할. 템플릿 내용별 1회만 수행."""
+    return tuple(_PLACEHOLDER_RE.split(template_content))
+
+
 def _render_fee_notice_message(template_content, sender_name, sender_phone, mention, unpaid_detail, fee_sheet_url):
     """회비 고지 템플릿 플레이스홀더를 실제 값으로 치환."""
-    message = template_content.replace('{발신자}', sender_name)
-    message = message.replace('{전화번호}', sender_phone)
-    message = message.replace('{멘션}', mention)
-    message = message.replace('{미납내역}', unpaid_detail)
-    message = message.replace('{납부문서URL}', fee_sheet_url)
-    return message
+    values = {
+        '발신자': sender_name,
+        '전화번호': sender_phone,
+        '멘션': mention,
+        '미납내역': unpaid_detail,
+        '납부문서URL': fee_sheet_url,
+    }
+    # split 결과의 홀수 인덱스는 캡처된 플레이스홀더명
+    return ''.join(
+        values[part] if i % 2 else part
+        for i, part in enumerate(_compile_template(template_content))
+    )
@@ -1,7 +1,7 @@
-import io
 import os
 import re
 import tempfile
+from functools import lru_cache
 from urllib.parse import parse_qs, urlparse
 
 
@@ -9,9 +9,12 @@ from urllib.parse import parse_qs, urlparse
 # URL parsing
 # ============================================================================
 
+_SHEET_ID_RE = re.compile(r'/spreadsheets/d/([a-zA-Z0-9_-]+)')
+
+
 def _extract_sheet_id(url):
     """Google Sheets URL에서 스프레드시트 ID 추출."""
-    match = re.search(r'/spreadsheets/d/([a-zA-Z0-9_-]+)', url)
+    match = _SHEET_ID_RE.search(url)
     if not match:
         raise ValueError(f'Google Sheets URL에서 ID를 파싱할 수 없습니다: {url}')
     return match.group(1)
@@ -24,6 +27,7 @@ def _extract_drive_folder_id(url):
     return parse_qs(urlparse(url).query).get('id', [None])[0]
 
 
+@lru_cache(maxsize=1024)
 def _extract_drive_file_id(url):
     """Google Drive 파일 URL에서 파일 ID 추출."""
     if '/d/' in url:
@@ -37,19 +41,22 @@ def _extract_drive_file_id(url):
 # Download
 # ============================================================================
 
-def _download_request_to_tempfile(request, suffix='.xlsx'):
-    """googleapiclient request를 임시 파일로 다운로드."""
+def _stream_request(request, fh, chunksize=None):
+    """googleapiclient request 응답을 열린 파일 객체 fh에 청크 단위로 기록."""
     from googleapiclient.http import MediaIoBaseDownload
 
-    buf = io.BytesIO()
-    downloader = MediaIoBaseDownload(buf, request)
+    kwargs = {'chunksize': chunksize} if chunksize else {}
+    downloader = MediaIoBaseDownload(fh, request, **kwargs)
     done = False
     while not done:
         _, done = downloader.next_chunk()
 
+
+def _download_request_to_tempfile(request, suffix='.xlsx'):
+    """googleapiclient request를 임시 파일로 청크 단위 스트리밍 다운로드."""
     tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
     try:
-        tmp.write(buf.getvalue())
+        _stream_request(request, tmp)
         tmp.close()
     except Exception:
         tmp.close()
@@ -57,3 +64,15 @@ def _download_request_to_tempfile(request, suffix='.xlsx'):
         raise
 
     return tmp.name
+
+
+def _download_request_to_file(request, path, chunksize=None):
+    """googleapiclient request를 path에 청크 단위 스트리밍 저장. 실패 시 부분 파일 삭제."""
+    try:
+        with open(path, 'wb') as f:
+            _stream_request(request, f, chunksize)
+    except Exception:
+        if os.path.exists(path):
+            os.unlink(path)
+        raise
+    return path
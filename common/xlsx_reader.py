@@ -0,0 +1,215 @@
+"""xlsx 시트 값 읽기 공통 유틸.
+
+python-calamine(Rust 기반 파서)이 설치되어 있으면 사용하고,
+없으면 xlsx(ZIP) 안의 sharedStrings/워크시트 XML을 표준 라이브러리로 직접 스트리밍한다.
+두 경로 모두 같은 형태의 값 행을 반환한다.
+"""
+import re
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+# xlsx(OOXML) 네임스페이스
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+_TAG_ROW = f'{{{_NS_MAIN}}}row'
+_TAG_C = f'{{{_NS_MAIN}}}c'
+_TAG_V = f'{{{_NS_MAIN}}}v'
+_TAG_T = f'{{{_NS_MAIN}}}t'
+_TAG_R = f'{{{_NS_MAIN}}}r'
+_TAG_IS = f'{{{_NS_MAIN}}}is'
+
+_CELL_COL_RE = re.compile(r'^([A-Z]+)')
+# 내장 날짜/시간 서식 ID (27~36, 50~58은 한중일 로케일 날짜 서식)
+_BUILTIN_DATE_FMT_IDS = frozenset([*range(14, 23), *range(27, 37), *range(45, 48), *range(50, 59)])
+# 사용자 서식 코드에서 따옴표 문자열·[색상/조건]·이스케이프 문자를 제거한 뒤 날짜 토큰 검사
+_FMT_LITERAL_RE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+_FMT_DATE_TOKEN_RE = re.compile(r'[dmyhs]', re.IGNORECASE)
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+def _read_rels(zf, rels_path):
+    """.rels 파일에서 {rId: Target} 매핑 반환. 파일이 없으면 빈 dict."""
+    if rels_path not in zf.namelist():
+        return {}
+    root = ET.fromstring(zf.read(rels_path))
+    return {rel.get('Id'): rel.get('Target') for rel in root.iter(f'{{{_NS_PKG_REL}}}Relationship')}
+
+
+def _sheet_xml_paths(zf):
+    """워크북의 {시트 이름: 워크시트 XML 경로} 매핑 반환 (워크북 시트 순서 유지)."""
+    wb_root = ET.fromstring(zf.read('xl/workbook.xml'))
+    wb_rels = _read_rels(zf, 'xl/_rels/workbook.xml.rels')
+    paths = {}
+    for sheet in wb_root.iter(f'{{{_NS_MAIN}}}sheet'):
+        target = wb_rels.get(sheet.get(f'{{{_NS_REL}}}id'))
+        if not target:
+            continue
+        if target.startswith('/'):
+            paths[sheet.get('name')] = target.lstrip('/')
+        else:
+            paths[sheet.get('name')] = posixpath.normpath(posixpath.join('xl', target))
+    return paths
+
+
+def _column_index(letters):
+    """'A' -> 1, 'AA' -> 27"""
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + ord(ch) - 64
+    return idx
+
+
+def _rich_text(elem):
+    """<si>/<is> 요소의 텍스트. 서식 런(<r><t>)은 이어 붙이고 발음 표기(<rPh>)는 제외."""
+    parts = [t.text or '' for t in elem.findall(_TAG_T)]
+    parts += [t.text or '' for t in elem.findall(f'{_TAG_R}/{_TAG_T}')]
+    return ''.join(parts)
+
+
+def _read_shared_strings(zf):
+    """sharedStrings 테이블을 list로 한 번만 읽는다. 없으면 빈 list."""
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    strings = []
+    with zf.open('xl/sharedStrings.xml') as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f'{{{_NS_MAIN}}}si':
+                strings.append(_rich_text(elem))
+                elem.clear()
+    return strings
+
+
+def _date_style_indices(zf):
+    """styles.xml의 cellXfs 중 날짜 서식을 쓰는 스타일 인덱스 집합."""
+    if 'xl/styles.xml' not in zf.namelist():
+        return frozenset()
+    root = ET.fromstring(zf.read('xl/styles.xml'))
+    custom_date_ids = set()
+    for fmt in root.iter(f'{{{_NS_MAIN}}}numFmt'):
+        code = _FMT_LITERAL_RE.sub('', fmt.get('formatCode', ''))
+        if _FMT_DATE_TOKEN_RE.search(code):
+            custom_date_ids.add(int(fmt.get('numFmtId')))
+
+    cell_xfs = root.find(f'{{{_NS_MAIN}}}cellXfs')
+    if cell_xfs is None:
+        return frozenset()
+    return frozenset(
+        i for i, xf in enumerate(cell_xfs.findall(f'{{{_NS_MAIN}}}xf'))
+        if int(xf.get('numFmtId', 0)) in _BUILTIN_DATE_FMT_IDS
+        or int(xf.get('numFmtId', 0)) in custom_date_ids
+    )
+
+
+def _cell_value(c, shared_strings, date_styles):
+    """<c> 요소를 파이썬 값으로 변환 (수식 셀은 캐시된 결과값)."""
+    cell_type = c.get('t', 'n')
+    if cell_type == 'inlineStr':
+        is_elem = c.find(_TAG_IS)
+        text = _rich_text(is_elem) if is_elem is not None else ''
+        return text or None
+
+    v = c.find(_TAG_V)
+    text = v.text if v is not None else None
+    if not text:
+        return None
+    if cell_type == 's':
+        return shared_strings[int(text)] or None
+    if cell_type in ('str', 'e'):
+        return text
+    if cell_type == 'b':
+        return text == '1'
+    if cell_type == 'd':
+        return datetime.fromisoformat(text)
+
+    number = float(text)
+    if c.get('s') is not None and int(c.get('s')) in date_styles:
+        # 부동소수 오차로 59.999초가 되지 않도록 밀리초 단위로 반올림
+        return _EXCEL_EPOCH + timedelta(milliseconds=round(number * 86_400_000))
+    return int(number) if number.is_integer() else number
+
+
+def _stream_sheet_rows(zf, sheet_path, shared_strings, date_styles, min_row, min_col, max_col):
+    """워크시트 XML을 iterparse로 한 번 훑어 min_row 이후 값 행 list 반환.
+
+    XML에 없는(완전히 빈) 행은 None으로 채워 행 번호를 유지한다.
+    """
+    width = max_col - min_col + 1
+    empty_row = (None,) * width
+    rows = []
+    row_num = 0
+
+    with zf.open(sheet_path) as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag != _TAG_ROW:
+                continue
+            row_num = int(elem.get('r', row_num + 1))
+            if row_num < min_row:
+                elem.clear()
+                continue
+
+            values = [None] * width
+            col = 0
+            for c in elem.iter(_TAG_C):
+                ref = c.get('r')
+                col = _column_index(_CELL_COL_RE.match(ref).group(1)) if ref else col + 1
+                if min_col <= col <= max_col:
+                    values[col - min_col] = _cell_value(c, shared_strings, date_styles)
+            elem.clear()
+
+            rows.extend([empty_row] * (row_num - min_row - len(rows)))
+            rows.append(tuple(values))
+    return rows
+
+
+def _read_with_calamine(CalamineWorkbook, file_path, sheet_filter, min_row, min_col, max_col):
+    width = max_col - min_col + 1
+    with open(file_path, 'rb') as f:
+        wb = CalamineWorkbook.from_filelike(f)
+
+    sheets = {}
+    for name in wb.sheet_names:
+        if not sheet_filter(name):
+            continue
+        # skip_empty_area=False: 앞쪽 빈 행/열을 잘라내지 않아야 행·열 번호가 유지됨
+        raw_rows = wb.get_sheet_by_name(name).to_python(skip_empty_area=False)
+        rows = []
+        for raw in raw_rows[min_row - 1:]:
+            values = [
+                None if v == '' else int(v) if isinstance(v, float) and v.is_integer() else v
+                for v in raw[min_col - 1:max_col]
+            ]
+            values.extend([None] * (width - len(values)))
+            rows.append(tuple(values))
+        sheets[name] = rows
+    return sheets
+
+
+def _read_with_zip_xml(file_path, sheet_filter, min_row, min_col, max_col):
+    with zipfile.ZipFile(file_path) as zf:
+        sheet_paths = _sheet_xml_paths(zf)
+        targets = {name: path for name, path in sheet_paths.items() if sheet_filter(name)}
+        if not targets:
+            return {}
+        shared_strings = _read_shared_strings(zf)
+        date_styles = _date_style_indices(zf)
+        return {
+            name: _stream_sheet_rows(zf, path, shared_strings, date_styles, min_row, min_col, max_col)
+            for name, path in targets.items()
+        }
+
+
+def _read_sheet_values(file_path, sheet_filter, min_row=1, min_col=1, max_col=1):
+    """sheet_filter(name)가 참인 시트의 값 행을 {시트 이름: [tuple, ...]}로 반환.
+
+    행/열 번호는 1-based. 빈 셀은 None, 각 행 길이는 max_col - min_col + 1.
+    반환 시점에 파일 읽기가 끝나므로 호출자는 바로 파일을 삭제해도 된다.
+    """
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        return _read_with_zip_xml(file_path, sheet_filter, min_row, min_col, max_col)
+    return _read_with_calamine(CalamineWorkbook, file_path, sheet_filter, min_row, min_col, max_col)
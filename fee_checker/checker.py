@@ -7,14 +7,18 @@ BCSD 회비 납부 검증 및 미납 메시지 생성 프로그램
 import os
 import sys
 import re
+import time
 import argparse
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import json
-import openpyxl
 from common.fee_notice import _render_fee_notice_message
+from common.xlsx_reader import _read_sheet_values
 
 
 # ============================================================================
@@ -23,6 +27,7 @@ from common.fee_notice import _render_fee_notice_message
 
 TEMPLATE_FILE = "templates/fee_notice.md"
 OUTPUT_BASE_DIR = "output"
+NOTICE_FILE_PATTERN = "*.txt"
 KEYWORDS_FILE = Path(__file__).parent / "keywords.json"
 
 # 제외 키워드 — fee_checker/keywords.json 에서 로드
@@ -59,6 +64,15 @@ MONTH_COLUMNS = {
     12: 16,  # Q
 }
 
+# 값 행에서 1~12월 셀을 한 번에 잘라내기 위한 슬라이스 (F~Q열)
+MONTH_COL_SLICE = slice(COL_MONTHS_START, COL_MONTHS_START + 12)
+
+# 월 셀 값 → 납부 상태 ("O": 납부, "-": 면제, 그 외: None = 미납)
+_MONTH_STATUS = {"O": "O", "-": "-", "−": "-"}
+
+# 월별 상태 비트마스크: bit (m - 1) = m월
+ALL_MONTHS_MASK = (1 << 12) - 1
+
 # 회비 금액
 MONTHLY_FEE = 10_000   # ~2026년 2월: 월 10,000원
 SEMESTER_FEE = 60_000  # 2026년 3월~: 학기당 60,000원
@@ -70,15 +84,22 @@ SEMESTERS_2026 = [
     (9, 12),  # 2학기 (2026 시트 내 구간)
 ]
 
+# Slack DM 동시 발송 스레드 수 (SLACK_DM_WORKERS 환경 변수로 조정)
+SLACK_DM_WORKERS = 8
+
+# DB에서 조회한 (이름, 트랙) → Slack ID 매핑 캐시
+SLACK_ID_CACHE_FILE = Path.home() / ".cache" / "bcsd_fee" / "slack_map.json"
+SLACK_ID_CACHE_TTL_HOURS = 24
+
 
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
 
-def parse_sheet(ws, sheet_name):
+def parse_sheet(sheet_rows, sheet_name):
     """
-    시트에서 데이터 행 파싱
+    시트 값 행(DATA_START_ROW부터의 tuple 목록)에서 데이터 행 파싱
 
     Returns:
         list of dict: 각 행의 데이터
@@ -86,77 +107,81 @@ def parse_sheet(ws, sheet_name):
                 'track': str,
                 'name': str,
                 'notes': str,
-                'months': {1: 'O'/'-'/None, 2: ..., 12: ...}
+                'paid_mask': int,    # 납부("O") 월 비트마스크
+                'exempt_mask': int,  # 면제("-") 월 비트마스크
             }
     """
     rows = []
-    row_idx = DATA_START_ROW
 
-    while True:
-        name_cell = ws.cell(row=row_idx, column=COL_NAME + 1)
-        name = name_cell.value
+    for values in sheet_rows:
+        name = values[COL_NAME]
 
         if name is None or str(name).strip() == "":
             break
 
-        track_cell = ws.cell(row=row_idx, column=COL_TRACK + 1)
-        notes_cell = ws.cell(row=row_idx, column=COL_NOTES + 1)
+        track = values[COL_TRACK] if values[COL_TRACK] else ""
+        notes = values[COL_NOTES] if values[COL_NOTES] else ""
 
-        track = track_cell.value if track_cell.value else ""
-        notes = notes_cell.value if notes_cell.value else ""
-
-        months = {}
-        for month_num, col_idx in MONTH_COLUMNS.items():
-            cell = ws.cell(row=row_idx, column=col_idx + 1)
-            val = cell.value
-
-            if val == "O":
-                months[month_num] = "O"
-            elif val == "-" or val == "−":
-                months[month_num] = "-"
-            else:
-                months[month_num] = None
+        paid_mask = exempt_mask = 0
+        for bit, val in enumerate(values[MONTH_COL_SLICE]):
+            status = _MONTH_STATUS.get(val)
+            if status == "O":
+                paid_mask |= 1 << bit
+            elif status == "-":
+                exempt_mask |= 1 << bit
 
         rows.append(
             {
                 "track": str(track).strip(),
                 "name": str(name).strip(),
                 "notes": str(notes).strip(),
-                "months": months,
+                "paid_mask": paid_mask,
+                "exempt_mask": exempt_mask,
             }
         )
 
-        row_idx += 1
-
     return rows
 
 
+def _month_range_mask(start_month, end_month):
+    """start_month~end_month(포함) 구간의 월 비트마스크. 구간이 비면 0."""
+    if end_month < start_month:
+        return 0
+    return ((1 << end_month) - 1) & ~((1 << (start_month - 1)) - 1)
+
+
+# 키워드 뒤 기간 표기: ~ 포함 여부로 단일 월 / 범위 / 개방형 구분
+_PERIOD_RE = re.compile(
+    r'\(\s*(\d{2,4})년\s*(\d{1,2})월'
+    r'(?:\s*(~)\s*(?:(\d{2,4})년\s*(\d{1,2})월\s*)?)?'
+    r'\s*\)?'
+)
+
+
+@lru_cache(maxsize=None)
+def _keyword_regex(keywords):
+    """키워드 튜플 → 단일 alternation 정규식 (긴 키워드 우선, 예: "군 휴학"이 "휴학"보다 먼저 매칭)"""
+    if not keywords:
+        return re.compile(r'(?!)')  # 키워드가 없으면 아무것도 매칭하지 않음
+    return re.compile('|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
 def parse_exclusion_periods(notes, sheet_year):
     """
-    비고에서 제외 기간 파싱 → sheet_year 내 제외 월 집합 반환
+    비고에서 제외 기간 파싱 → sheet_year 내 제외 월 비트마스크 반환
 
     기간이 명시된 키워드("트랙장 (24년 11월~25년 9월)" 등)는 해당 기간 월만 제외.
     기간 미기재("졸업", "활동 중지" 등)는 시트 전체(1~12월) 제외.
     """
     if not notes:
-        return set()
-
-    excluded_months = set()
+        return 0
 
-    # ~ 포함 여부로 단일 월 / 범위 / 개방형 구분
-    period_pattern = re.compile(
-        r'\(\s*(\d{2,4})년\s*(\d{1,2})월'
-        r'(?:\s*(~)\s*(?:(\d{2,4})년\s*(\d{1,2})월\s*)?)?'
-        r'\s*\)?'
-    )
-    # 긴 키워드 우선 매칭 (예: "군 휴학"이 "휴학"보다 먼저 매칭되도록)
-    keyword_pattern = re.compile(
-        '|'.join(re.escape(k) for k in sorted(EXCLUDE_KEYWORDS, key=len, reverse=True))
-    )
+    excluded_mask = 0
+    keyword_pattern = _keyword_regex(tuple(EXCLUDE_KEYWORDS))
 
     for kw_match in keyword_pattern.finditer(notes):
         after_keyword = notes[kw_match.end():].lstrip()
-        period_match = period_pattern.match(after_keyword) if after_keyword.startswith('(') else None
+        period_match = _PERIOD_RE.match(after_keyword) if after_keyword.startswith('(') else None
 
         if period_match:
             start_year = int(period_match.group(1))
@@ -180,30 +205,28 @@ def parse_exclusion_periods(notes, sheet_year):
 
             for m in range(1, 13):
                 if (start_year, start_month) <= (sheet_year, m) <= (end_year, end_month):
-                    excluded_months.add(m)
+                    excluded_mask |= 1 << (m - 1)
         else:
             # 기간 미기재: 시트 전체 적용
-            excluded_months.update(range(1, 13))
+            excluded_mask = ALL_MONTHS_MASK
 
-    return excluded_months
+    return excluded_mask
 
 
-def should_exclude_row(row_data, sheet_year):
+def should_exclude_row(row_data, sheet_year, excluded_mask=None):
     """
     행 제외 여부 판단
 
-    비고 기간을 파싱해 해당 월만 제외 처리.
+    비고 기간을 파싱해 해당 월만 제외 처리 (excluded_mask를 넘기면 재파싱 생략).
     모든 월이 납부("O"), 면제("-"), 또는 제외 기간 내에 있으면 True 반환.
     """
-    excluded_months = parse_exclusion_periods(row_data["notes"], sheet_year)
-    months = row_data["months"]
-    return all(
-        val == "O" or val == "-" or m in excluded_months
-        for m, val in months.items()
-    )
+    if excluded_mask is None:
+        excluded_mask = parse_exclusion_periods(row_data["notes"], sheet_year)
+    covered = row_data["paid_mask"] | row_data["exempt_mask"] | excluded_mask
+    return covered == ALL_MONTHS_MASK
 
 
-def calculate_unpaid_detail(row_data, sheet_name, current_month):
+def calculate_unpaid_detail(row_data, sheet_name, current_month, excluded_mask=None):
     """
     미납 상세 계산
 
@@ -215,51 +238,37 @@ def calculate_unpaid_detail(row_data, sheet_name, current_month):
         row_data: parse_sheet() 반환 행 데이터
         sheet_name: "2025" 또는 "2026"
         current_month: 현재 월 (1~12)
+        excluded_mask: parse_exclusion_periods() 결과 (None이면 비고에서 직접 파싱)
 
     Returns:
         dict:
             monthly_amount   (int)       — 월별 미납 금액 합계
             unpaid_semesters (list[str]) — 미납 학기 식별자 목록 (예: ['26-1', '26-2'])
     """
-    months = row_data["months"]
-    sheet_year = int(sheet_name)
-    excluded_months = parse_exclusion_periods(row_data["notes"], sheet_year)
-
-    if sheet_name == "2025":
-        unpaid = sum(
-            1 for m in range(1, 13)
-            if months.get(m) is None and m not in excluded_months
-        )
-        return {"monthly_amount": unpaid * MONTHLY_FEE, "unpaid_semesters": []}
+    if excluded_mask is None:
+        excluded_mask = parse_exclusion_periods(row_data["notes"], int(sheet_name))
+
+    # 미납 월 비트마스크: 값이 비어 있고 제외 기간이 아닌 월
+    unpaid_mask = ALL_MONTHS_MASK & ~(row_data["paid_mask"] | row_data["exempt_mask"] | excluded_mask)
 
     if sheet_name == "2026":
         check_until = current_month - 1
-        monthly_amount = 0
-        unpaid_semesters = []
 
         # 1~2월: 월별 10,000원
-        for m in range(1, min(2, check_until) + 1):
-            if months.get(m) is None and m not in excluded_months:
-                monthly_amount += MONTHLY_FEE
+        monthly_amount = MONTHLY_FEE * (unpaid_mask & _month_range_mask(1, min(2, check_until))).bit_count()
 
         # 학기별: 체크 대상 구간 내 미납 월이 하나라도 있으면 학기비 전액 청구
         year_short = int(sheet_name) % 100
-        for i, (sem_start, sem_end) in enumerate(SEMESTERS_2026, 1):
-            checked = [
-                m for m in range(sem_start, sem_end + 1)
-                if m <= check_until and m not in excluded_months
-            ]
-            if checked and any(months.get(m) is None for m in checked):
-                unpaid_semesters.append(f"{year_short}-{i}")
+        unpaid_semesters = [
+            f"{year_short}-{i}"
+            for i, (sem_start, sem_end) in enumerate(SEMESTERS_2026, 1)
+            if unpaid_mask & _month_range_mask(sem_start, min(sem_end, check_until))
+        ]
 
         return {"monthly_amount": monthly_amount, "unpaid_semesters": unpaid_semesters}
 
-    # 기타 시트
-    unpaid = sum(
-        1 for m in range(1, 13)
-        if months.get(m) is None and m not in excluded_months
-    )
-    return {"monthly_amount": unpaid * MONTHLY_FEE, "unpaid_semesters": []}
+    # 2025 및 기타 시트: 월별 10,000원
+    return {"monthly_amount": unpaid_mask.bit_count() * MONTHLY_FEE, "unpaid_semesters": []}
 
 
 def _format_unpaid_detail(name, data, date_year, date_month, date_day):
@@ -300,9 +309,12 @@ def _format_unpaid_detail(name, data, date_year, date_month, date_day):
     return f"{prefix} 회비가 미납되었습니다."
 
 
+_IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
 def _validate_identifier(value):
     """SQL 식별자 검증: 영문자·숫자·언더스코어만 허용 (SQL 인젝션 방지)"""
-    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', value):
+    if not _IDENTIFIER_RE.fullmatch(value):
         raise ValueError(f"유효하지 않은 SQL 식별자: '{value}'")
     return value
 
@@ -314,17 +326,26 @@ def _normalize_name(name):
     return str(name).strip()
 
 
+_TRACK_STRIP_RE = re.compile(r'[^a-zA-Z]')
+
+
+@lru_cache(maxsize=256)
 def _normalize_track(track):
     """트랙명 정규화: 영문자만 추출 후 소문자 변환 (예: 'FrontEnd' → 'frontend')"""
     if track is None:
         return ""
-    return re.sub(r'[^a-zA-Z]', '', track).lower()
+    return _TRACK_STRIP_RE.sub('', track).lower()
+
+
+# SSH 터널 포워딩 시 한 번에 주고받는 바이트 수 (SSH 채널 기본 패킷 크기와 맞춤)
+_TUNNEL_BUFSIZE = 32768
 
 
 @contextmanager
 def _ssh_tunnel(ssh_host, ssh_port, ssh_user, remote_host, remote_port, ssh_key_path=None, ssh_password=None):
     """paramiko 기반 SSH 포트 포워딩 터널"""
     import select
+    import socket
     import threading
     import socketserver
     import paramiko
@@ -354,18 +375,20 @@ def _ssh_tunnel(ssh_host, ssh_port, ssh_user, remote_host, remote_port, ssh_key_
             )
             if chan is None:
                 return
+            # 작은 쿼리 패킷이 Nagle 알고리즘에 묶여 지연되지 않도록
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             while True:
                 readable = select.select([self.request, chan], [], [], 5)[0]
                 if self.request in readable:
-                    data = self.request.recv(1024)
+                    data = self.request.recv(_TUNNEL_BUFSIZE)
                     if not data:
                         break
-                    chan.send(data)
+                    chan.sendall(data)
                 if chan in readable:
-                    data = chan.recv(1024)
+                    data = chan.recv(_TUNNEL_BUFSIZE)
                     if not data:
                         break
-                    self.request.send(data)
+                    self.request.sendall(data)
             chan.close()
 
     server = None
@@ -428,8 +451,11 @@ def _db_connection():
             conn.close()
 
 
-def fetch_slack_id_map():
-    """DB에서 (이름, 트랙명) → Slack ID 매핑 조회 (readonly SELECT)"""
+def fetch_slack_id_map(names=None):
+    """DB에서 (이름, 트랙명) → Slack ID 매핑 조회 (readonly SELECT)
+
+    names가 주어지면 해당 이름의 멤버만 WHERE 절에서 걸러 조회한다.
+    """
     table          = _validate_identifier(os.getenv("DB_TABLE", ""))
     col_name       = _validate_identifier(os.getenv("DB_COL_NAME", "name"))
     col_slack_id   = _validate_identifier(os.getenv("DB_COL_SLACK_ID", "slack_id"))
@@ -442,22 +468,94 @@ def fetch_slack_id_map():
         os.getenv("DB_TRACK_COL_IS_DELETED", os.getenv("DB_COL_IS_DELETED", "is_deleted"))
     )
 
+    query = (
+        f"SELECT m.`{col_name}`, t.`{track_col_name}` AS track_name, m.`{col_slack_id}`"
+        f" FROM `{table}` m"
+        f" JOIN `{track_table}` t ON m.`{col_track_id}` = t.`{track_col_id}`"
+        f" WHERE m.`{col_slack_id}` IS NOT NULL AND m.`{col_slack_id}` != ''"
+        f" AND m.`{col_is_deleted}` = 0 AND t.`{track_col_is_deleted}` = 0"
+    )
+    params = None
+    if names is not None:
+        names = sorted(set(names))
+        if not names:
+            return {}
+        # 트랙명 정규화(영문자만 추출)는 SQL로 표현할 수 없으므로 이름만 DB에서 거르고 트랙은 아래에서 매칭
+        # names는 _normalize_name()으로 앞뒤 공백을 뺀 값이므로 DB 쪽도 TRIM해서 비교 (NO PAD 콜레이션 대비)
+        query += f" AND TRIM(m.`{col_name}`) IN %s"
+        params = (names,)
+
     with _db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                f"SELECT m.`{col_name}`, t.`{track_col_name}` AS track_name, m.`{col_slack_id}`"
-                f" FROM `{table}` m"
-                f" JOIN `{track_table}` t ON m.`{col_track_id}` = t.`{track_col_id}`"
-                f" WHERE m.`{col_slack_id}` IS NOT NULL AND m.`{col_slack_id}` != ''"
-                f" AND m.`{col_is_deleted}` = 0 AND t.`{track_col_is_deleted}` = 0"
-            )
+        import pymysql.cursors
+
+        # SSCursor: 결과를 클라이언트에 한꺼번에 버퍼링하지 않고 행 단위(tuple)로 스트리밍
+        with conn.cursor(pymysql.cursors.SSCursor) as cur:
+            cur.execute(query, params)
             return {
-                (_normalize_name(row[col_name]), _normalize_track(row["track_name"])): row[col_slack_id]
-                for row in cur.fetchall()
+                (_normalize_name(name), _normalize_track(track_name)): slack_id
+                for name, track_name, slack_id in cur
             }
 
 
-def aggregate_unpaid_fees(wb, current_month, excluded_tracks=None, excluded_persons=None):
+def _cached_slack_id_map(names, ttl_hours=SLACK_ID_CACHE_TTL_HOURS):
+    """fetch_slack_id_map() 결과를 로컬 JSON에 캐시 (이름별 조회 시각 기준 ttl_hours 동안 DB 조회 생략)
+
+    캐시에 없거나 만료된 이름만 DB에서 다시 조회해 캐시에 합친다.
+    만료된 항목은 다시 저장하지 않으므로 파일에 남지 않는다.
+    """
+    names = {_normalize_name(name) for name in names}
+    now = time.time()
+    ttl_seconds = ttl_hours * 3600
+    fetched_at, id_map = {}, {}
+    try:
+        with open(SLACK_ID_CACHE_FILE, encoding="utf-8") as f:
+            cached = json.load(f)
+        fetched_at = {
+            name: float(ts) for name, ts in cached["names"].items()
+            if now - float(ts) < ttl_seconds
+        }
+        id_map = {
+            (name, track): slack_id
+            for name, track, slack_id in cached["map"]
+            if name in fetched_at
+        }
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        fetched_at, id_map = {}, {}  # 캐시 없음/손상/이전 형식 → DB 조회
+
+    missing = names - fetched_at.keys()
+    if not missing:
+        print(f"[INFO] Slack ID 캐시 사용: {SLACK_ID_CACHE_FILE}")
+        return id_map
+
+    print(f"[INFO] DB에서 Slack ID 조회 중... ({len(missing)}명)")
+    id_map.update(fetch_slack_id_map(missing))
+    fetched_at.update(dict.fromkeys(missing, now))
+    try:
+        SLACK_ID_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(SLACK_ID_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "names": fetched_at,
+                    "map": [[name, track, slack_id] for (name, track), slack_id in id_map.items()],
+                },
+                f, ensure_ascii=False,
+            )
+    except OSError as e:
+        print(f"[WARNING] Slack ID 캐시 저장 실패: {e}")
+    return id_map
+
+
+def _scan_exempt_names(rows_2025):
+    """2025 시트에서 영구 면제 키워드가 있고 면제 기간이 2026년까지 이어지는 이름 집합"""
+    permanent_re = _keyword_regex(tuple(PERMANENT_EXCLUDE_KEYWORDS))
+    return {
+        row_data["name"]
+        for row_data in rows_2025
+        if permanent_re.search(row_data["notes"]) and parse_exclusion_periods(row_data["notes"], 2026)
+    }
+
+
+def aggregate_unpaid_fees(sheets, current_month, excluded_tracks=None, excluded_persons=None):
     """
     2025/2026 시트 데이터 통합 및 미납 금액 계산
 
@@ -465,88 +563,68 @@ def aggregate_unpaid_fees(wb, current_month, excluded_tracks=None, excluded_pers
         dict: {(name, track): {'name': str, 'track': str, 'unpaid_amount': int,
                                'monthly_amount': int, 'unpaid_semesters': list[str]}}
     """
-    if excluded_tracks is None:
-        excluded_tracks = set()
-    else:
-        excluded_tracks = set(excluded_tracks)
-    if excluded_persons is None:
-        excluded_persons = set()
-    else:
-        excluded_persons = set(excluded_persons)
-
-    aggregated = {}
-    excluded_keys = set()
-    exempt_names_from_2025 = set()
+    excluded_tracks = frozenset(excluded_tracks or ())
+    excluded_persons = frozenset(excluded_persons or ())
 
+    rows_by_sheet = {}
     for sheet_name in SHEETS_TO_PROCESS:
-        if sheet_name not in wb.sheetnames:
+        if sheet_name not in sheets:
             print(f"[WARNING] 시트 '{sheet_name}' 없음, 건너뜀")
             continue
+        rows_by_sheet[sheet_name] = parse_sheet(sheets[sheet_name], sheet_name)
 
-        ws = wb[sheet_name]
-        rows = parse_sheet(ws, sheet_name)
+    # 2025 시트의 영구 면제자는 모든 시트에서 집계 전에 제외
+    exempt_names_from_2025 = _scan_exempt_names(rows_by_sheet.get("2025", ()))
 
+    aggregated = {}
+
+    for sheet_name, rows in rows_by_sheet.items():
         print(f"\n[INFO] 시트 '{sheet_name}': {len(rows)}개 행 파싱됨")
 
+        sheet_year = int(sheet_name)
         included_count = 0
         excluded_count = 0
 
-        if sheet_name == "2025":
-            for row_data in rows:
-                notes = row_data["notes"]
-                has_permanent = any(kw in notes for kw in PERMANENT_EXCLUDE_KEYWORDS)
-                if has_permanent and parse_exclusion_periods(notes, 2026):
-                    # 면제 기간이 2026년까지 이어지는 경우만 다음 시트에 이어감
-                    exempt_names_from_2025.add(row_data["name"])
-
         for row_data in rows:
             name = row_data["name"]
             track = row_data["track"]
-            key = (name, track)
-
-            if name in exempt_names_from_2025:
+            norm_track = _normalize_track(track)
+
+            if (
+                name in exempt_names_from_2025
+                or norm_track in excluded_tracks
+                or (name, norm_track) in excluded_persons
+                # 모든 월이 이미 납부/면제면 비고를 볼 필요 없이 제외
+                or row_data["paid_mask"] | row_data["exempt_mask"] == ALL_MONTHS_MASK
+            ):
                 excluded_count += 1
                 continue
 
-            if _normalize_track(track) in excluded_tracks:
-                excluded_keys.add(key)
-                excluded_count += 1
-                continue
-
-            if (name, _normalize_track(track)) in excluded_persons:
-                excluded_keys.add(key)
-                excluded_count += 1
-                continue
-
-            if should_exclude_row(row_data, int(sheet_name)):
+            # 비고 기간은 한 번만 파싱해 제외 판단과 미납 계산에 함께 사용
+            excluded_mask = parse_exclusion_periods(row_data["notes"], sheet_year)
+            if should_exclude_row(row_data, sheet_year, excluded_mask):
                 excluded_count += 1
                 continue
 
             included_count += 1
 
-            detail = calculate_unpaid_detail(row_data, sheet_name, current_month)
+            detail = calculate_unpaid_detail(row_data, sheet_name, current_month, excluded_mask)
             unpaid_amount = detail["monthly_amount"] + len(detail["unpaid_semesters"]) * SEMESTER_FEE
 
-            if key not in aggregated:
-                aggregated[key] = {
-                    "name": name,
-                    "track": track,
-                    "unpaid_amount": 0,
-                    "monthly_amount": 0,
-                    "unpaid_semesters": [],
-                }
-
-            aggregated[key]["unpaid_amount"] += unpaid_amount
-            aggregated[key]["monthly_amount"] += detail["monthly_amount"]
-            aggregated[key]["unpaid_semesters"].extend(detail["unpaid_semesters"])
+            entry = aggregated.setdefault((name, track), {
+                "name": name,
+                "track": track,
+                "unpaid_amount": 0,
+                "monthly_amount": 0,
+                "unpaid_semesters": [],
+            })
+            entry["unpaid_amount"] += unpaid_amount
+            entry["monthly_amount"] += detail["monthly_amount"]
+            entry["unpaid_semesters"].extend(detail["unpaid_semesters"])
 
         print(f"[INFO] 시트 '{sheet_name}': 포함 {included_count}명, 제외 {excluded_count}명")
 
-    for excluded_key in excluded_keys:
-        aggregated.pop(excluded_key, None)
-
-    filtered = {k: v for k, v in aggregated.items() if v["unpaid_amount"] > 0}
-    return filtered
+    return {k: v for k, v in aggregated.items() if v["unpaid_amount"] > 0}
 
 
 # ============================================================================
@@ -554,23 +632,22 @@ def aggregate_unpaid_fees(wb, current_month, excluded_tracks=None, excluded_pers
 # ============================================================================
 
 
-def collect_unrecognized_notes(wb, unpaid_data):
+def collect_unrecognized_notes(sheets, unpaid_data):
     """미납 대상자 중 비고가 있으나 면제 키워드 미인식인 항목 수집"""
     unpaid_names = {name for name, _ in unpaid_data.keys()}
     seen_notes = set()
     result = []
 
     for sheet_name in SHEETS_TO_PROCESS:
-        if sheet_name not in wb.sheetnames:
+        if sheet_name not in sheets:
             continue
-        ws = wb[sheet_name]
-        rows = parse_sheet(ws, sheet_name)
+        rows = parse_sheet(sheets[sheet_name], sheet_name)
         for row_data in rows:
             name = row_data["name"]
             notes = row_data["notes"]
             if name not in unpaid_names or not notes:
                 continue
-            if any(kw in notes for kw in EXCLUDE_KEYWORDS):
+            if _keyword_regex(tuple(EXCLUDE_KEYWORDS)).search(notes):
                 continue
             key = (notes, sheet_name)
             if key not in seen_notes:
@@ -622,22 +699,28 @@ def prompt_extra_keywords(unrecognized):
 # ============================================================================
 
 
-def get_output_directory():
+@lru_cache(maxsize=4)
+def _load_template(template_path):
+    """템플릿 파일 내용 반환 (경로별로 한 번만 읽음)"""
+    return Path(template_path).read_text(encoding="utf-8")
+
+
+def get_output_directory(now=None):
     """현재 연-월 기준으로 output 디렉토리 생성 및 반환 (예: output/2026-02/)"""
-    now = datetime.now()
+    now = now or datetime.now()
     output_dir = os.path.join(OUTPUT_BASE_DIR, f"{now.year:04d}-{now.month:02d}")
     os.makedirs(output_dir, exist_ok=True)
     return output_dir
 
 
-def _previous_month_last_day():
+def _previous_month_last_day(now=None):
     """전월 말일 datetime 객체 반환"""
-    return datetime.now().replace(day=1) - timedelta(days=1)
+    return (now or datetime.now()).replace(day=1) - timedelta(days=1)
 
 
-def get_previous_month_end_date():
+def get_previous_month_end_date(now=None):
     """전월 말일을 한국어 형식으로 반환 (예: "2026년 1월 31일")"""
-    last_day = _previous_month_last_day()
+    last_day = _previous_month_last_day(now)
     return f"{last_day.year}년 {last_day.month}월 {last_day.day}일"
 
 
@@ -646,39 +729,62 @@ def format_amount(amount):
     return f"{amount:,}"
 
 
-def generate_unique_filename(name, track, used_filenames):
-    """중복 이름 처리를 위한 고유 파일명 생성"""
+def generate_unique_filename(name, track, used_filenames, next_counters=None):
+    """중복 이름 처리를 위한 고유 파일명 생성
+
+    next_counters: {(name, track): 다음에 시도할 번호} — 넘기면 같은 이름이 반복될 때
+    1번부터 다시 탐색하지 않고 마지막 번호 다음부터 이어서 확인한다.
+    """
     track_filename = f"{name}_{track}.txt"
 
     if track_filename not in used_filenames:
         used_filenames.add(track_filename)
         return track_filename
 
-    counter = 1
+    counter = next_counters.get((name, track), 1) if next_counters is not None else 1
     while True:
         numbered_filename = f"{name}_{track}_{counter}.txt"
         if numbered_filename not in used_filenames:
             used_filenames.add(numbered_filename)
+            if next_counters is not None:
+                next_counters[(name, track)] = counter + 1
             return numbered_filename
         counter += 1
 
 
-def generate_message_files(unpaid_data, output_dir, template_path):
+def _write_text_file(filepath, text):
+    """UTF-8로 미리 인코딩한 뒤 os.write로 기록 (파일마다 TextIOWrapper 생성 생략)"""
+    view = memoryview(text.encode("utf-8"))
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def generate_message_files(unpaid_data, output_dir, template_path, last_day=None):
     """
     미납 회원별 메시지 파일 생성
 
     Returns:
         tuple: (생성된 파일 수, 총 미납 금액)
     """
-    for existing_file in Path(output_dir).glob("*.txt"):
-        existing_file.unlink()
+    # 이전 실행의 안내문 파일 정리 (scandir 한 번으로 이름만 보고 판별)
+    try:
+        with os.scandir(output_dir) as entries:
+            for entry in entries:
+                if fnmatch.fnmatchcase(entry.name, NOTICE_FILE_PATTERN) and entry.is_file():
+                    os.unlink(entry.path)
+    except FileNotFoundError:
+        os.makedirs(output_dir, exist_ok=True)
 
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
+    template_content = _load_template(template_path)
 
-    last_day = _previous_month_last_day()
+    last_day = last_day or _previous_month_last_day()
 
     used_filenames = set()
+    next_counters = {}
     files_generated = 0
     total_unpaid_amount = 0
 
@@ -688,23 +794,27 @@ def generate_message_files(unpaid_data, output_dir, template_path):
     if not fee_sheet_url:
         print("[WARNING] FEE_SHEET_URL 환경 변수가 설정되지 않았습니다. 납부문서 링크가 비어 있습니다.")
 
+    # 회원마다 바뀌지 않는 값은 루프 밖에서 한 번만 계산
+    mention = f"@{sender_name}" if sender_name else "{멘션}"
+    date_year, date_month, date_day = last_day.year, last_day.month, last_day.day
+    join_path = os.path.join
+
     for (name, track), data in unpaid_data.items():
-        unpaid_detail = _format_unpaid_detail(name, data, last_day.year, last_day.month, last_day.day)
+        unpaid_detail = _format_unpaid_detail(name, data, date_year, date_month, date_day)
 
         message = _render_fee_notice_message(
             template_content=template_content,
             sender_name=sender_name,
             sender_phone=sender_phone,
-            mention=f"@{sender_name}" if sender_name else "{멘션}",
+            mention=mention,
             unpaid_detail=unpaid_detail,
             fee_sheet_url=fee_sheet_url,
         )
 
-        filename = generate_unique_filename(name, track, used_filenames)
-        filepath = os.path.join(output_dir, filename)
+        filename = generate_unique_filename(name, track, used_filenames, next_counters)
+        filepath = join_path(output_dir, filename)
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(message)
+        _write_text_file(filepath, message)
 
         files_generated += 1
         total_unpaid_amount += data["unpaid_amount"]
@@ -712,7 +822,12 @@ def generate_message_files(unpaid_data, output_dir, template_path):
     return files_generated, total_unpaid_amount
 
 
-def send_slack_dms(unpaid_data, template_path):
+def _send_slack_dm(client, user_id, message):
+    """user_id로 바로 메시지 발송 (Slack이 DM 채널을 자동으로 열어 주므로 conversations.open 생략)"""
+    client.chat_postMessage(channel=user_id, text=message)
+
+
+def send_slack_dms(unpaid_data, template_path, last_day=None):
     """
     미납 회원에게 Slack DM 발송
 
@@ -722,6 +837,7 @@ def send_slack_dms(unpaid_data, template_path):
     try:
         from slack_sdk import WebClient
         from slack_sdk.errors import SlackApiError
+        from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
     except ImportError as err:
         raise ImportError("slack_sdk 패키지가 필요합니다: pip install slack-sdk") from err
 
@@ -743,19 +859,25 @@ def send_slack_dms(unpaid_data, template_path):
     if not fee_sheet_url:
         raise ValueError("FEE_SHEET_URL 환경 변수가 설정되지 않았습니다.")
 
+    try:
+        workers = max(1, int(os.getenv("SLACK_DM_WORKERS", str(SLACK_DM_WORKERS))))
+    except ValueError:
+        raise ValueError("SLACK_DM_WORKERS 환경 변수가 유효한 정수가 아닙니다.") from None
+
     client = WebClient(token=token)
+    # 병렬 발송 중 rate limit(429) 응답은 Retry-After만큼 대기 후 재시도
+    client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=3))
 
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
+    template_content = _load_template(template_path)
 
-    last_day = _previous_month_last_day()
+    last_day = last_day or _previous_month_last_day()
 
-    print("[INFO] DB에서 Slack ID 조회 중...")
-    name_to_user_id = fetch_slack_id_map()
+    name_to_user_id = _cached_slack_id_map(name for name, _ in unpaid_data)
     print(f"[INFO] 조회된 멤버 수: {len(name_to_user_id)}명")
 
     sent = 0
     failed = 0
+    jobs = []
 
     for (name, track), data in unpaid_data.items():
         user_id = name_to_user_id.get((_normalize_name(name), _normalize_track(track)))
@@ -773,19 +895,26 @@ def send_slack_dms(unpaid_data, template_path):
             unpaid_detail=unpaid_detail,
             fee_sheet_url=fee_sheet_url,
         )
-
-        try:
-            dm_resp = client.conversations_open(users=[user_id])
-            channel_id = dm_resp["channel"]["id"]
-            client.chat_postMessage(channel=channel_id, text=message)
-            print(f"[INFO] DM 발송 완료: {name} ({track})")
-            sent += 1
-        except SlackApiError as e:
-            print(f"[ERROR] DM 발송 실패: {name} ({track}) - {e.response['error']}")
-            failed += 1
-        except Exception as e:
-            print(f"[ERROR] DM 발송 중 예외 발생: {name} ({track}) - {e}")
-            failed += 1
+        jobs.append((name, track, user_id, message))
+
+    # 발송은 네트워크 대기 위주이므로 스레드 풀로 병렬 처리
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_send_slack_dm, client, user_id, message): (name, track)
+            for name, track, user_id, message in jobs
+        }
+        for future in as_completed(futures):
+            name, track = futures[future]
+            try:
+                future.result()
+                print(f"[INFO] DM 발송 완료: {name} ({track})")
+                sent += 1
+            except SlackApiError as e:
+                print(f"[ERROR] DM 발송 실패: {name} ({track}) - {e.response['error']}")
+                failed += 1
+            except Exception as e:
+                print(f"[ERROR] DM 발송 중 예외 발생: {name} ({track}) - {e}")
+                failed += 1
 
     return sent, failed
 
@@ -850,7 +979,11 @@ def main():
     print("BCSD 회비 납부 검증 및 미납 메시지 생성 프로그램")
     print("=" * 70)
 
-    output_dir = get_output_directory()
+    # 실행 기준 시각은 한 번만 구해 출력 디렉토리·기준일·현재 월에 공통 사용
+    now = datetime.now()
+    last_day = _previous_month_last_day(now)
+
+    output_dir = get_output_directory(now)
     print(f"\n[INFO] 출력 디렉토리: {output_dir}")
 
     if excluded_tracks:
@@ -878,23 +1011,29 @@ def main():
     print("=" * 70)
 
     try:
-        wb = openpyxl.load_workbook(tmp_path, data_only=False)
+        # 처리 대상 시트의 값만 읽음 (python-calamine 설치 시 Rust 파서 사용)
+        sheets = _read_sheet_values(
+            tmp_path,
+            lambda name: name in SHEETS_TO_PROCESS,
+            min_row=DATA_START_ROW,
+            max_col=COL_MONTHS_START + 12,
+        )
     finally:
         if os.path.exists(tmp_path):
             os.unlink(tmp_path)
-    current_month = datetime.now().month
+    current_month = now.month
 
     print(f"[INFO] 현재 월: {current_month}")
     print(f"[INFO] 처리 대상 시트: {SHEETS_TO_PROCESS}")
 
-    unpaid_data = aggregate_unpaid_fees(wb, current_month, excluded_tracks, excluded_persons)
+    unpaid_data = aggregate_unpaid_fees(sheets, current_month, excluded_tracks, excluded_persons)
 
-    unrecognized = collect_unrecognized_notes(wb, unpaid_data)
+    unrecognized = collect_unrecognized_notes(sheets, unpaid_data)
     extra_keywords = prompt_extra_keywords(unrecognized)
     if extra_keywords:
         EXCLUDE_KEYWORDS.extend(extra_keywords)
         print(f"[INFO] 추가된 면제 키워드: {extra_keywords}")
-        unpaid_data = aggregate_unpaid_fees(wb, current_month, excluded_tracks, excluded_persons)
+        unpaid_data = aggregate_unpaid_fees(sheets, current_month, excluded_tracks, excluded_persons)
 
     print("\n" + "=" * 70)
     print("미납 데이터 요약")
@@ -913,7 +1052,7 @@ def main():
     print("=" * 70)
 
     files_generated, total_unpaid_amount = generate_message_files(
-        unpaid_data, output_dir, TEMPLATE_FILE
+        unpaid_data, output_dir, TEMPLATE_FILE, last_day=last_day
     )
 
     print(f"\n[INFO] 생성된 파일 수: {files_generated}개")
@@ -923,7 +1062,7 @@ def main():
         print("\n" + "=" * 70)
         print("Slack DM 발송")
         print("=" * 70)
-        dm_sent, dm_failed = send_slack_dms(unpaid_data, TEMPLATE_FILE)
+        dm_sent, dm_failed = send_slack_dms(unpaid_data, TEMPLATE_FILE, last_day=last_day)
         print(f"[INFO] DM 발송 완료: {dm_sent}명, 실패/미매칭: {dm_failed}명")
 
     print("\n" + "=" * 70)
@@ -2,12 +2,25 @@ import os
 import sys
 from dotenv import load_dotenv
 from pyhwpx import Hwp
-from ledger.hwp.image_packer import pack
+from ledger.hwp.image_packer import _get_cell, _load_imgs, pack
 
 load_dotenv()
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 
+def _row_imgs(loaded, paths):
+    """미리 로드한 결과에서 행의 Img 목록 구성 (로드 실패는 기존처럼 예외로 전달)"""
+    imgs = []
+    for path in paths:
+        img = loaded[path]
+        if isinstance(img, Exception):
+            raise img
+        imgs.append(img)
+    return imgs
+
 def run(data, t_path, o_path):
+    # 이미지 디코딩은 HWP COM 작업과 무관하므로 시작 전에 병렬로 끝내 둔다
+    loaded = _load_imgs(p for paths in data.get('img_paths', ()) if paths for p in paths)
+
     hwp = Hwp(visible=DEBUG)
     try:
         hwp.register_module()
@@ -47,6 +60,7 @@ def run(data, t_path, o_path):
         hwp.MovePageDown()
 
         i = 1
+        cell_size = None  # 모든 표가 템플릿 복사본이므로 이미지 셀 크기는 한 번만 조회
         for idx, row in data.iterrows():
             hwp.get_into_nth_table(i)
             i += 1
@@ -58,7 +72,9 @@ def run(data, t_path, o_path):
                 print(f"{idx}. 증빙 자료 누락. 확인 필요")
                 continue
 
-            pack(hwp, row['img_paths'])
+            if cell_size is None and hwp.ParentCtrl and hwp.ParentCtrl.CtrlID == 'tbl':
+                cell_size = _get_cell(hwp)
+            pack(hwp, row['img_paths'], cell_size, _row_imgs(loaded, row['img_paths']))
 
         hwp.save()
 
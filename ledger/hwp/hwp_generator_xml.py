@@ -5,25 +5,61 @@ HWPX는 ZIP + XML 구조이므로, 템플릿 파일을 언패킹하여
 section0.xml을 파싱·수정한 뒤 다시 패킹한다.
 """
 
+import copy
 import itertools
 import os
+import re
+import shutil
 import zipfile
 from collections.abc import Callable
 from dataclasses import dataclass, field
+from functools import lru_cache
 from lxml import etree
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
 from PIL.Image import DecompressionBombError
 
-from ledger.hwp.image_packer import Img, _layout
+from ledger.hwp.image_packer import Img, _layout, _load_imgs
 
 # ── HWPX XML 네임스페이스 ──────────────────────────────────────────────
 HP = 'http://www.hancom.co.kr/hwpml/2011/paragraph'
 HC = 'http://www.hancom.co.kr/hwpml/2011/core'
 
+# 자주 쓰는 네임스페이스 포함 태그 이름 (매 호출마다 f-string을 만들지 않도록 미리 계산)
+_P               = f'{{{HP}}}p'
+_RUN             = f'{{{HP}}}run'
+_TBL             = f'{{{HP}}}tbl'
+_TR              = f'{{{HP}}}tr'
+_TC              = f'{{{HP}}}tc'
+_SUBLIST         = f'{{{HP}}}subList'
+_LINESEGARRAY    = f'{{{HP}}}linesegarray'
+_LINESEG         = f'{{{HP}}}lineseg'
+_POS             = f'{{{HP}}}pos'
+_OUTMARGIN       = f'{{{HP}}}outMargin'
+_CELLSZ          = f'{{{HP}}}cellSz'
+_CELLMARGIN      = f'{{{HP}}}cellMargin'
+_T               = f'{{{HP}}}t'
+
 # ── 단위 변환 ──────────────────────────────────────────────────────────
 # 1 inch = 7200 HWP unit = 25.4 mm  →  1 mm ≈ 283.465 HWP unit
 HWP_PER_MM = 7200 / 25.4
 
+# ── 템플릿 XML 파서 ────────────────────────────────────────────────────
+# xml:id 해시 테이블 생성·엔티티 확장 없음, 수 MB 섹션도 파싱 (공백 텍스트 노드는 그대로 유지)
+_XML_PARSER = etree.XMLParser(collect_ids=False, resolve_entities=False, huge_tree=True)
+
+# ── ZIP 항목 이름 ──────────────────────────────────────────────────────
+SEC_KEY = 'Contents/section0.xml'
+HPF_KEY = 'Contents/content.hpf'
+_BIN_RE = re.compile(r'^BinData/image(\d+)\.')
+# XML 선언의 standalone 값 (<?xml ... standalone="yes"?>, 앞에 UTF-8 BOM이 있어도 인식)
+_STANDALONE_RE = re.compile(rb'(?:\xef\xbb\xbf)?\s*<\?xml[^>]*?\sstandalone\s*=\s*["\'](yes|no)["\']')
+# 출력 deflate 레벨: XML은 레벨 1로도 충분히 줄고, 기본값(6)은 CPU를 몇 배 더 쓴다
+_ZIP_COMPRESSLEVEL = 1
+# 템플릿 무압축 항목 복사 버퍼 크기
+_COPY_BUFSIZE = 1024 * 1024
+# 자체 압축 포맷 → 신규 BinData 항목을 ZIP_STORED로 기록
+_STORED_EXTS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp'})
+
 
 @dataclass
 class _TemplateParams:
@@ -84,17 +120,13 @@ def _make_next_id(start: int = 100_000_000) -> Callable[[], int]:
     return lambda: next(counter)
 
 
-def _max_binary_idx(zip_files: dict) -> int:
+def _max_binary_idx(names) -> int:
     """BinData/imageN.* 중 최대 N 반환."""
-    idx = 0
-    for name in zip_files:
-        if name.startswith('BinData/image'):
-            try:
-                n = int(name.split('/image')[1].split('.')[0])
-                idx = max(idx, n)
-            except ValueError:
-                pass
-    return idx
+    return max((int(m.group(1)) for m in map(_BIN_RE.match, names) if m), default=0)
+
+
+# root 자신을 포함한 모든 요소의 zOrder 속성 값 (libxml2에서 한 번에 수집)
+_ZORDER_XPATH = etree.XPath('descendant-or-self::*/@zOrder')
 
 
 def _max_z_order(root: etree._Element) -> int:
@@ -105,13 +137,19 @@ def _max_z_order(root: etree._Element) -> int:
             return None
 
     return max(
-        (n for e in root.iter()
-         if (z := e.get('zOrder')) is not None
-         if (n := _safe_int(z)) is not None),
+        (n for z in _ZORDER_XPATH(root) if (n := _safe_int(z)) is not None),
         default=0,
     )
 
 
+# 직계 hp:p > hp:run > hp:tbl(2행 1열) 중 첫 행 셀의 첫 단락 런에 hp:t가 있는 단락
+_EXPENSE_P_XPATH = etree.XPath(
+    './hp:p[hp:run/hp:tbl[@rowCnt="2" and @colCnt="1"][count(hp:tr) >= 2]'
+    '[hp:tr[1]/hp:tc[1]/hp:subList[1]/hp:p[1]/hp:run[1]/hp:t]]',
+    namespaces={'hp': HP},
+)
+
+
 _MIME = {
     'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg',
     'bmp': 'image/bmp', 'gif': 'image/gif',  'webp': 'image/webp',
@@ -119,7 +157,7 @@ _MIME = {
 
 def _update_content_hpf(hpf_bytes: bytes, new_binaries: dict) -> bytes:
     """content.hpf의 opf:manifest에 신규 바이너리 항목을 추가한다."""
-    root = etree.fromstring(hpf_bytes)
+    root = etree.fromstring(hpf_bytes, parser=_XML_PARSER)
     # 네임스페이스를 루트 태그에서 동적으로 추출 (하드코딩 오류 방지)
     opf_ns = root.tag.split('}')[0].lstrip('{') if '}' in root.tag else ''
     manifest = root.find(f'{{{opf_ns}}}manifest') if opf_ns else root.find('manifest')
@@ -129,11 +167,11 @@ def _update_content_hpf(hpf_bytes: bytes, new_binaries: dict) -> bytes:
             "템플릿의 OPF 구조/네임스페이스를 확인하세요."
         )
 
-    for bin_path in new_binaries:               # 'BinData/image4.png'
-        fname = bin_path.split('/')[-1]          # 'image4.png'
-        bid   = fname.rsplit('.', 1)[0]          # 'image4'
-        ext   = fname.rsplit('.', 1)[-1].lower() # 'png'
-        etree.SubElement(manifest, f'{{{opf_ns}}}item', {
+    item_tag = f'{{{opf_ns}}}item'
+    for bin_path in new_binaries:                            # 'BinData/image4.png'
+        bid, _, ext = bin_path.rpartition('/')[2].rpartition('.')  # 'image4', 'png'
+        ext = ext.lower()
+        etree.SubElement(manifest, item_tag, {
             'id':         bid,
             'href':       bin_path,
             'media-type': _MIME.get(ext, 'application/octet-stream'),
@@ -148,41 +186,7 @@ def _find_expense_ps(root: etree._Element) -> list:
     2행 1열이라는 구조 조건 외에, 첫 번째 행 셀에 텍스트 런(hp:t)이
     존재하는지 추가로 검사하여 무관한 표가 오탐되는 것을 방지한다.
     """
-    result = []
-    for p in root:
-        if p.tag != f'{{{HP}}}p':
-            continue
-        matched = False
-        for run in p:
-            if matched:
-                break
-            if run.tag != f'{{{HP}}}run':
-                continue
-            for tbl in run:
-                if not (tbl.tag == f'{{{HP}}}tbl'
-                        and tbl.get('rowCnt') == '2'
-                        and tbl.get('colCnt') == '1'):
-                    continue
-                rows = tbl.findall(f'{{{HP}}}tr')
-                if len(rows) < 2:
-                    continue
-                # 첫 번째 행: 제목 텍스트(hp:t)가 있는 셀인지 확인
-                title_tc = rows[0].find(f'{{{HP}}}tc')
-                if title_tc is None:
-                    continue
-                sl = title_tc.find(f'{{{HP}}}subList')
-                if sl is None:
-                    continue
-                para = sl.find(f'{{{HP}}}p')
-                if para is None:
-                    continue
-                run_el = para.find(f'{{{HP}}}run')
-                if run_el is None or run_el.find(f'{{{HP}}}t') is None:
-                    continue
-                result.append(p)
-                matched = True
-                break
-    return result
+    return _EXPENSE_P_XPATH(root)
 
 
 def _read_template_params(expense_ps: list) -> _TemplateParams:
@@ -204,17 +208,17 @@ def _read_template_params(expense_ps: list) -> _TemplateParams:
 
     # ── 래퍼 단락 스타일 ──────────────────────────────────────────────
     p.wrap_para_pr = wrap_p.get('paraPrIDRef', p.wrap_para_pr)
-    wrap_run = wrap_p.find(f'{{{HP}}}run')
+    wrap_run = wrap_p.find(_RUN)
     if wrap_run is not None:
         p.wrap_char_pr = wrap_run.get('charPrIDRef', p.wrap_char_pr)
-        wrap_lsa = wrap_p.find(f'{{{HP}}}linesegarray')
+        wrap_lsa = wrap_p.find(_LINESEGARRAY)
         if wrap_lsa is not None and len(wrap_lsa) > 0:
             p.wrap_lineseg = dict(wrap_lsa[0].attrib)
 
     # ── 표 속성 ───────────────────────────────────────────────────────
     tbl = next(
         (t for r in (wrap_run,) if r is not None
-         for t in r if t.tag == f'{{{HP}}}tbl' and t.get('colCnt') == '1'),
+         for t in r if t.tag == _TBL and t.get('colCnt') == '1'),
         None,
     )
     if tbl is None:
@@ -222,46 +226,46 @@ def _read_template_params(expense_ps: list) -> _TemplateParams:
 
     p.border_fill_id = tbl.get('borderFillIDRef', p.border_fill_id)
 
-    tbl_pos = tbl.find(f'{{{HP}}}pos')
+    tbl_pos = tbl.find(_POS)
     if tbl_pos is not None:
         p.vert_offset = _int_or(tbl_pos.get('vertOffset'), p.vert_offset)
 
-    tbl_out = tbl.find(f'{{{HP}}}outMargin')
+    tbl_out = tbl.find(_OUTMARGIN)
     if tbl_out is not None:
         p.out_margin = _int_or(tbl_out.get('bottom'), p.out_margin)
 
     # ── 행별 셀 크기·스타일 ───────────────────────────────────────────
-    rows = tbl.findall(f'{{{HP}}}tr')
+    rows = tbl.findall(_TR)
     if len(rows) < 2:
         return p
 
     def _from_tc(tc: etree._Element | None, is_title: bool) -> None:
         if tc is None:
             return
-        csz = tc.find(f'{{{HP}}}cellSz')
+        csz = tc.find(_CELLSZ)
         if csz is not None:
             p.cell_w = _int_or(csz.get('width'), p.cell_w)
             if is_title:
                 p.title_row_h = _int_or(csz.get('height'), p.title_row_h)
             else:
                 p.img_cell_h = _int_or(csz.get('height'), p.img_cell_h)
-        cm = tc.find(f'{{{HP}}}cellMargin')
+        cm = tc.find(_CELLMARGIN)
         if cm is not None:
             p.margin_lr = _int_or(cm.get('left'), p.margin_lr)
             p.margin_tb = _int_or(cm.get('top'),  p.margin_tb)
-        sl = tc.find(f'{{{HP}}}subList')
+        sl = tc.find(_SUBLIST)
         if sl is None:
             return
-        para = sl.find(f'{{{HP}}}p')
+        para = sl.find(_P)
         if para is None:
             return
-        run = para.find(f'{{{HP}}}run')
+        run = para.find(_RUN)
         if is_title:
             p.title_para_pr  = para.get('paraPrIDRef', p.title_para_pr)
             p.title_style_id = para.get('styleIDRef',  p.title_style_id)
             if run is not None:
                 p.title_char_pr = run.get('charPrIDRef', p.title_char_pr)
-            lsa = para.find(f'{{{HP}}}linesegarray')
+            lsa = para.find(_LINESEGARRAY)
             if lsa is not None and len(lsa) > 0:
                 p.title_lineseg = dict(lsa[0].attrib)
         else:
@@ -270,101 +274,89 @@ def _read_template_params(expense_ps: list) -> _TemplateParams:
             if run is not None:
                 p.img_char_pr = run.get('charPrIDRef', p.img_char_pr)
 
-    _from_tc(rows[0].find(f'{{{HP}}}tc'), is_title=True)
-    _from_tc(rows[1].find(f'{{{HP}}}tc'), is_title=False)
+    _from_tc(rows[0].find(_TC), is_title=True)
+    _from_tc(rows[1].find(_TC), is_title=False)
     return p
 
 
+_HP_QNAMES: dict[str, str] = {}
+
+
 def _hp(parent: etree._Element, tag: str, attribs: dict | None = None) -> etree._Element:
-    return etree.SubElement(parent, f'{{{HP}}}{tag}', attribs or {})
+    qname = _HP_QNAMES.get(tag)
+    if qname is None:
+        qname = _HP_QNAMES[tag] = f'{{{HP}}}{tag}'
+    if attribs is None:
+        return etree.SubElement(parent, qname)
+    return etree.SubElement(parent, qname, attribs)
 
 
 # ── 핵심 XML 빌더 ──────────────────────────────────────────────────────
 
+# hp:pic 골격 — 요소마다 SubElement를 호출하는 대신 값만 채워 한 번에 파싱한다.
+# 요소 순서는 pyhwpx가 생성하는 순서를 따른다:
+#   orgSz = 표시 크기 (물리적 크기가 아닌 렌더링 크기), curSz = 0,0 → "sz와 동일",
+#   scaMatrix = identity (orgSz이 이미 표시 크기이므로 배율 불필요), img는 imgRect 앞,
+#   imgRect 좌표는 orgSz 기준, imgClip/imgDim = 물리적 원본 크기 (전체 이미지 사용, 크롭 없음)
+_PIC_TEMPLATE = (
+    f'<hp:pic xmlns:hp="{HP}" xmlns:hc="{HC}"'
+    ' id="{pid}" zOrder="{z}" numberingType="PICTURE" textWrap="TOP_AND_BOTTOM"'
+    ' textFlow="BOTH_SIDES" lock="0" dropcapstyle="None" href="" groupLevel="0"'
+    ' instid="{instid}" reverse="0">'
+    '<hp:offset x="0" y="0"/>'
+    '<hp:orgSz width="{w}" height="{h}"/>'
+    '<hp:curSz width="0" height="0"/>'
+    '<hp:flip horizontal="0" vertical="0"/>'
+    '<hp:rotationInfo angle="0" centerX="{cx}" centerY="{cy}" rotateimage="1"/>'
+    '<hp:renderingInfo>'
+    '<hc:transMatrix e1="1" e2="0" e3="0" e4="0" e5="1" e6="0"/>'
+    '<hc:scaMatrix e1="1" e2="0" e3="0" e4="0" e5="1" e6="0"/>'
+    '<hc:rotMatrix e1="1" e2="0" e3="0" e4="0" e5="1" e6="0"/>'
+    '</hp:renderingInfo>'
+    '<hc:img binaryItemIDRef="{binary_id}" bright="0" contrast="0" effect="REAL_PIC" alpha="0"/>'
+    '<hp:imgRect>'
+    '<hc:pt0 x="0" y="0"/><hc:pt1 x="{w}" y="0"/>'
+    '<hc:pt2 x="{w}" y="{h}"/><hc:pt3 x="0" y="{h}"/>'
+    '</hp:imgRect>'
+    '<hp:imgClip left="0" right="{org_w}" top="0" bottom="{org_h}"/>'
+    '<hp:inMargin left="0" right="0" top="0" bottom="0"/>'
+    '<hp:imgDim dimwidth="{org_w}" dimheight="{org_h}"/>'
+    '<hp:effects/>'
+    '<hp:sz width="{w}" widthRelTo="ABSOLUTE" height="{h}" heightRelTo="ABSOLUTE" protect="0"/>'
+    '<hp:pos treatAsChar="1" affectLSpacing="0" flowWithText="1" allowOverlap="0"'
+    ' holdAnchorAndSO="0" vertRelTo="PARA" horzRelTo="COLUMN" vertAlign="TOP"'
+    ' horzAlign="LEFT" vertOffset="0" horzOffset="0"/>'
+    '<hp:outMargin left="0" right="0" top="0" bottom="0"/>'
+    '<hp:shapeComment/>'
+    '</hp:pic>'
+)
+
+
 def _build_pic(
     binary_id: str, img: Img, disp_w: int, disp_h: int, z: int,
     next_id: Callable[[], int],
 ) -> etree._Element:
     """인라인(treatAsChar=1) 이미지 요소를 만든다."""
-    # 물리적 원본 크기: DPI 없으면 96 DPI 가정 (pyhwpx 기본값)
-    with Image.open(img.path) as im:
-        raw_dpi = im.info.get('dpi')
-    if isinstance(raw_dpi, (tuple, list)) and len(raw_dpi) >= 2:
-        try:
-            dpi_x = float(raw_dpi[0]) or 96
-            dpi_y = float(raw_dpi[1]) or 96
-        except (TypeError, ValueError):
-            dpi_x = dpi_y = 96.0
-    else:
-        dpi_x = dpi_y = 96.0
+    # 물리적 원본 크기: DPI는 Img 로드 시 헤더에서 읽어 둔 값 (없으면 96 DPI)
+    dpi_x, dpi_y = img.dpi
     org_w = round(img.w / dpi_x * 7200)  # 물리적 크기 (HWP unit) → imgClip/imgDim 용
     org_h = round(img.h / dpi_y * 7200)
 
-    pic = etree.Element(f'{{{HP}}}pic', {
-        'id':            str(next_id()),
-        'zOrder':        str(z),
-        'numberingType': 'PICTURE',
-        'textWrap':      'TOP_AND_BOTTOM',
-        'textFlow':      'BOTH_SIDES',
-        'lock':          '0',
-        'dropcapstyle':  'None',
-        'href':          '',
-        'groupLevel':    '0',
-        'instid':        str(next_id()),
-        'reverse':       '0',
-    })
-
-    _hp(pic, 'offset',  {'x': '0', 'y': '0'})
-    # orgSz = 표시 크기 (pyhwpx 방식: 물리적 크기가 아닌 렌더링 크기)
-    _hp(pic, 'orgSz',   {'width': str(disp_w), 'height': str(disp_h)})
-    # curSz = 0,0 → "sz와 동일" 의미 (pyhwpx 동작)
-    _hp(pic, 'curSz',   {'width': '0', 'height': '0'})
-    _hp(pic, 'flip',    {'horizontal': '0', 'vertical': '0'})
-    _hp(pic, 'rotationInfo', {
-        'angle': '0', 'centerX': str(disp_w // 2), 'centerY': str(disp_h // 2),
-        'rotateimage': '1',
-    })
+    return etree.fromstring(_PIC_TEMPLATE.format(
+        pid=next_id(), z=z, instid=next_id(), binary_id=binary_id,
+        w=disp_w, h=disp_h, cx=disp_w // 2, cy=disp_h // 2, org_w=org_w, org_h=org_h,
+    ))
 
-    ri = _hp(pic, 'renderingInfo')
-    etree.SubElement(ri, f'{{{HC}}}transMatrix',
-                     {'e1': '1', 'e2': '0', 'e3': '0', 'e4': '0', 'e5': '1', 'e6': '0'})
-    # scaMatrix = identity (orgSz이 이미 표시 크기이므로 배율 불필요)
-    etree.SubElement(ri, f'{{{HC}}}scaMatrix',
-                     {'e1': '1', 'e2': '0', 'e3': '0', 'e4': '0', 'e5': '1', 'e6': '0'})
-    etree.SubElement(ri, f'{{{HC}}}rotMatrix',
-                     {'e1': '1', 'e2': '0', 'e3': '0', 'e4': '0', 'e5': '1', 'e6': '0'})
-
-    # img는 imgRect 앞에 위치 (pyhwpx 요소 순서)
-    etree.SubElement(pic, f'{{{HC}}}img', {
-        'binaryItemIDRef': binary_id,
-        'bright': '0', 'contrast': '0', 'effect': 'REAL_PIC', 'alpha': '0',
-    })
 
-    # imgRect 좌표는 orgSz(= 표시 크기) 기준
-    img_rect = _hp(pic, 'imgRect')
-    for tag, x, y in [('pt0', 0, 0), ('pt1', disp_w, 0), ('pt2', disp_w, disp_h), ('pt3', 0, disp_h)]:
-        etree.SubElement(img_rect, f'{{{HC}}}{tag}', {'x': str(x), 'y': str(y)})
-
-    # imgClip right/bottom = 물리적 원본 크기 (전체 이미지 사용, 크롭 없음)
-    _hp(pic, 'imgClip',  {'left': '0', 'right': str(org_w), 'top': '0', 'bottom': str(org_h)})
-    _hp(pic, 'inMargin', {'left': '0', 'right': '0', 'top': '0', 'bottom': '0'})
-    # imgDim = 물리적 원본 크기 (pyhwpx가 생성하는 메타데이터)
-    _hp(pic, 'imgDim',   {'dimwidth': str(org_w), 'dimheight': str(org_h)})
-    _hp(pic, 'effects')
-    _hp(pic, 'sz', {
-        'width': str(disp_w), 'widthRelTo': 'ABSOLUTE',
-        'height': str(disp_h), 'heightRelTo': 'ABSOLUTE', 'protect': '0',
-    })
-    _hp(pic, 'pos', {
-        'treatAsChar': '1', 'affectLSpacing': '0', 'flowWithText': '1',
-        'allowOverlap': '0', 'holdAnchorAndSO': '0',
-        'vertRelTo': 'PARA', 'horzRelTo': 'COLUMN',
-        'vertAlign': 'TOP', 'horzAlign': 'LEFT',
-        'vertOffset': '0', 'horzOffset': '0',
-    })
-    _hp(pic, 'outMargin', {'left': '0', 'right': '0', 'top': '0', 'bottom': '0'})
-    _hp(pic, 'shapeComment')
-    return pic
+# _build_table에서 표마다 반복되는 고정 속성 (lxml이 속성을 복사하므로 공유해도 안전)
+_SUBLIST_ATTRS = {
+    'id': '', 'textDirection': 'HORIZONTAL', 'lineWrap': 'BREAK',
+    'vertAlign': 'CENTER', 'linkListIDRef': '0', 'linkListNextIDRef': '0',
+    'textWidth': '0', 'textHeight': '0', 'hasTextRef': '0', 'hasNumRef': '0',
+}
+_CELL_ADDR_TITLE = {'colAddr': '0', 'rowAddr': '0'}
+_CELL_ADDR_IMG   = {'colAddr': '0', 'rowAddr': '1'}
+_CELL_SPAN       = {'colSpan': '1', 'rowSpan': '1'}
 
 
 def _build_table(
@@ -380,7 +372,7 @@ def _build_table(
     mt = str(params.margin_tb)
     bf = params.border_fill_id
 
-    tbl = etree.Element(f'{{{HP}}}tbl', {
+    tbl = etree.Element(_TBL, {
         'id':              str(next_id()),
         'zOrder':          str(z),
         'numberingType':   'TABLE',
@@ -417,11 +409,7 @@ def _build_table(
     tc1 = _hp(tr1, 'tc', {'name': '', 'header': '0', 'hasMargin': '0',
                            'protect': '0', 'editable': '0', 'dirty': '0',
                            'borderFillIDRef': bf})
-    sl1 = _hp(tc1, 'subList', {
-        'id': '', 'textDirection': 'HORIZONTAL', 'lineWrap': 'BREAK',
-        'vertAlign': 'CENTER', 'linkListIDRef': '0', 'linkListNextIDRef': '0',
-        'textWidth': '0', 'textHeight': '0', 'hasTextRef': '0', 'hasNumRef': '0',
-    })
+    sl1 = _hp(tc1, 'subList', _SUBLIST_ATTRS)
     p1  = _hp(sl1, 'p', {'id': str(next_id()),
                           'paraPrIDRef': params.title_para_pr,
                           'styleIDRef':  params.title_style_id,
@@ -430,8 +418,8 @@ def _build_table(
     _hp(r1, 't').text = title
     lsa1 = _hp(p1, 'linesegarray')
     _hp(lsa1, 'lineseg', params.title_lineseg)
-    _hp(tc1, 'cellAddr',   {'colAddr': '0', 'rowAddr': '0'})
-    _hp(tc1, 'cellSpan',   {'colSpan': '1', 'rowSpan': '1'})
+    _hp(tc1, 'cellAddr',   _CELL_ADDR_TITLE)
+    _hp(tc1, 'cellSpan',   _CELL_SPAN)
     _hp(tc1, 'cellSz',     {'width': str(params.cell_w), 'height': str(params.title_row_h)})
     _hp(tc1, 'cellMargin', {'left': m, 'right': m, 'top': mt, 'bottom': mt})
 
@@ -440,11 +428,7 @@ def _build_table(
     tc2 = _hp(tr2, 'tc', {'name': '', 'header': '0', 'hasMargin': '0',
                            'protect': '0', 'editable': '0', 'dirty': '0',
                            'borderFillIDRef': bf})
-    sl2 = _hp(tc2, 'subList', {
-        'id': '', 'textDirection': 'HORIZONTAL', 'lineWrap': 'BREAK',
-        'vertAlign': 'CENTER', 'linkListIDRef': '0', 'linkListNextIDRef': '0',
-        'textWidth': '0', 'textHeight': '0', 'hasTextRef': '0', 'hasNumRef': '0',
-    })
+    sl2 = _hp(tc2, 'subList', _SUBLIST_ATTRS)
 
     img_horzsize = params.title_lineseg.get('horzsize', '50856')
     if img_rows:
@@ -477,14 +461,91 @@ def _build_table(
                               'textheight': '1000', 'baseline': '850', 'spacing': '600',
                               'horzpos': '0', 'horzsize': img_horzsize, 'flags': '393216'})
 
-    _hp(tc2, 'cellAddr',   {'colAddr': '0', 'rowAddr': '1'})
-    _hp(tc2, 'cellSpan',   {'colSpan': '1', 'rowSpan': '1'})
+    _hp(tc2, 'cellAddr',   _CELL_ADDR_IMG)
+    _hp(tc2, 'cellSpan',   _CELL_SPAN)
     _hp(tc2, 'cellSz',     {'width': str(params.cell_w), 'height': str(params.img_cell_h)})
     _hp(tc2, 'cellMargin', {'left': m, 'right': m, 'top': mt, 'bottom': mt})
 
     return tbl, z
 
 
+def _row_img_paths(raw) -> list:
+    """행의 img_paths 값을 경로 list로 정규화 (None/단일 문자열/기타 iterable 허용)."""
+    if isinstance(raw, list):
+        return raw
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        return [raw]
+    try:
+        return list(raw)
+    except TypeError:
+        return []
+
+
+# ── 템플릿 로드 ────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=8)
+def _load_template(t_path: str, mtime: float) -> tuple:
+    """템플릿 HWPX에서 수정 대상 파일과 레이아웃 파라미터를 읽는다.
+
+    (경로, 수정 시각) 단위로 캐시하므로 같은 템플릿으로 반복 실행하면
+    ZIP 해제·XML 파싱·파라미터 추출을 건너뛴다. 반환된 root/params는
+    캐시에 공유되므로 호출자는 복사본을 수정해야 한다.
+    반환: (ZIP 항목 이름 tuple, section0 root, content.hpf bytes, _TemplateParams,
+          section0 XML 선언의 standalone 값 — 선언에 없으면 None)
+    """
+    # 수정 대상 두 파일만 메모리에 읽음
+    with zipfile.ZipFile(t_path, 'r') as zin:
+        names = tuple(zin.namelist())
+        if SEC_KEY not in names:
+            raise ValueError(f"템플릿 HWPX에 '{SEC_KEY}'가 없습니다. 올바른 HWPX 파일인지 확인하세요.")
+        if HPF_KEY not in names:
+            raise ValueError(f"템플릿 HWPX에 '{HPF_KEY}'가 없습니다. 올바른 HWPX 파일인지 확인하세요.")
+        sec_bytes = zin.read(SEC_KEY)
+        hpf_bytes = zin.read(HPF_KEY)
+
+    root = etree.fromstring(sec_bytes, parser=_XML_PARSER)
+    expense_ps = _find_expense_ps(root)
+    if len(expense_ps) > 1:
+        raise ValueError(
+            f"증빙 표 후보가 {len(expense_ps)}개 발견되었습니다. "
+            "템플릿에 2행 1열 표가 여러 개 있거나 구조가 예상과 다릅니다. "
+            "올바른 템플릿 파일인지 확인하세요."
+        )
+    # docinfo.standalone은 선언 누락과 'no'를 구분하지 못하므로 선언 문자열에서 직접 읽는다
+    m = _STANDALONE_RE.match(sec_bytes)
+    standalone = (m.group(1) == b'yes') if m else None
+    return names, root, hpf_bytes, _read_template_params(expense_ps), standalone
+
+
+# ── HWPX 패킹 ────────────────────────────────────────────────────────
+
+def _write_hwpx(t_path: str, out_path: str, overrides: dict, new_binaries: dict) -> None:
+    """템플릿 항목(overrides로 교체) + 신규 바이너리를 out_path에 HWPX로 패킹한다.
+
+    원본 ZipInfo를 재사용해 타임스탬프·외부속성을 보존하고, 나머지 항목은
+    템플릿에서 하나씩 읽어 바로 기록하므로 전체를 메모리에 올리지 않는다.
+    """
+    with zipfile.ZipFile(t_path, 'r') as zin, \
+            zipfile.ZipFile(out_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=_ZIP_COMPRESSLEVEL) as zout:
+        for info in zin.infolist():
+            content = overrides.get(info.filename)
+            if content is None and info.compress_type == zipfile.ZIP_STORED:
+                # 무압축 항목(미리보기·내장 이미지 등)은 통째로 읽지 않고 청크 단위로 복사
+                with zin.open(info) as src, zout.open(info, 'w') as dst:
+                    shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+                continue
+            # ZipInfo로 쓰면 아카이브 기본 압축 레벨이 적용되지 않으므로 항목마다 지정
+            zout.writestr(info, content if content is not None else zin.read(info.filename),
+                          compresslevel=_ZIP_COMPRESSLEVEL)
+        for path, content in new_binaries.items():
+            # 이미 압축된 이미지 포맷은 다시 deflate해도 거의 줄지 않으므로 무압축 저장
+            ext = path.rsplit('.', 1)[-1].lower()
+            compress = zipfile.ZIP_STORED if ext in _STORED_EXTS else zipfile.ZIP_DEFLATED
+            zout.writestr(path, content, compress_type=compress)
+
+
 # ── 공개 진입점 ────────────────────────────────────────────────────────
 
 def run(data, t_path: str, o_path: str):
@@ -507,65 +568,52 @@ def run(data, t_path: str, o_path: str):
             "한글에서 '다른 이름으로 저장 → .hwpx'로 변환 후 다시 시도하세요."
         )
 
-    with zipfile.ZipFile(t_path, 'r') as zin:
-        # ZipInfo 보존: 원본 압축 방식을 출력 시 그대로 유지
-        zip_infos = {info.filename: info for info in zin.infolist()}
-        zip_files = {name: zin.read(name) for name in zin.namelist()}
-
-    # 2. section0.xml / content.hpf 존재 여부 확인
-    SEC_KEY = 'Contents/section0.xml'
-    HPF_KEY = 'Contents/content.hpf'
-    if SEC_KEY not in zip_files:
-        raise ValueError(f"템플릿 HWPX에 '{SEC_KEY}'가 없습니다. 올바른 HWPX 파일인지 확인하세요.")
-    if HPF_KEY not in zip_files:
-        raise ValueError(f"템플릿 HWPX에 '{HPF_KEY}'가 없습니다. 올바른 HWPX 파일인지 확인하세요.")
-
-    # 3. section0.xml 파싱
-    root = etree.fromstring(zip_files[SEC_KEY])
+    # 2~3. section0.xml / content.hpf 읽기 + 파싱 (같은 템플릿이면 캐시 재사용)
+    names, tpl_root, hpf_bytes, tpl_params, standalone = _load_template(t_path, os.path.getmtime(t_path))
+    root   = copy.deepcopy(tpl_root)
+    params = copy.deepcopy(tpl_params)
 
     # 4. 기존 증빙 표 단락 제거 (삽입 위치 기억)
     expense_ps = _find_expense_ps(root)
-    if len(expense_ps) > 1:
-        raise ValueError(
-            f"증빙 표 후보가 {len(expense_ps)}개 발견되었습니다. "
-            "템플릿에 2행 1열 표가 여러 개 있거나 구조가 예상과 다릅니다. "
-            "올바른 템플릿 파일인지 확인하세요."
-        )
-    params     = _read_template_params(expense_ps)
-    insert_idx = list(root).index(expense_ps[0]) if expense_ps else len(list(root))
+    # 삽입 위치는 기존 표 단락 바로 다음 형제로 기억 (None이면 맨 뒤에 추가)
+    anchor = expense_ps[0].getnext() if expense_ps else None
     for p in expense_ps:
         root.remove(p)
 
     # 5. 카운터 초기화
-    bin_counter = _max_binary_idx(zip_files) + 1
+    bin_counter = _max_binary_idx(names) + 1
     z           = _max_z_order(root) + 1
     new_binaries: dict[str, bytes] = {}
 
     # 6. 지출 행마다 표 생성 (data_idx = 장부 전체 기준 0-based 인덱스 → +1이 장부 순번)
-    for data_idx, row in data.iterrows():
-        fee_suffix = ' (이체 수수료 500원)' if row.get('이체수수료', False) else ''
-        title = f'{data_idx + 1}. {row["종류"]}{fee_suffix}'
-        raw = row.get('img_paths', [])
-        if isinstance(raw, list):
-            img_paths = raw
-        elif raw is None:
-            img_paths = []
-        elif isinstance(raw, str):
-            img_paths = [raw]
-        else:
-            try:
-                img_paths = list(raw)
-            except TypeError:
-                img_paths = []
+    #    이미지 읽기·헤더 검사는 XML 조작과 무관하므로 먼저 스레드 풀에서 한꺼번에 끝내 두고,
+    #    XML 생성과 ID/바이너리 번호 할당은 메인 스레드에서 행 순서대로 처리한다
+    #    행마다 Series를 만드는 iterrows 대신 필요한 열만 list로 한 번에 꺼낸다
+    n = len(data)
+    kinds = data['종류'].tolist()
+    fees = data['이체수수료'].tolist() if '이체수수료' in data.columns else [False] * n
+    img_paths_col = data['img_paths'].tolist() if 'img_paths' in data.columns else [[]] * n
+    rows = [
+        (data_idx, kind, fee, _row_img_paths(raw))
+        for data_idx, kind, fee, raw in zip(data.index.tolist(), kinds, fees, img_paths_col)
+    ]
+    loaded = _load_imgs((p for *_, paths in rows for p in paths), read_data=True)
+
+    for data_idx, kind, fee, img_paths in rows:
+        fee_suffix = ' (이체 수수료 500원)' if fee else ''
+        title = f'{data_idx + 1}. {kind}{fee_suffix}'
 
         img_rows: list[list] = []
         if img_paths:
             imgs = []
             for p in img_paths:
-                try:
-                    imgs.append(Img(p))
-                except (OSError, UnidentifiedImageError, DecompressionBombError) as e:
-                    print(f"  [{data_idx + 1}] 이미지 로드 실패: {p} ({e}) — 건너뜀")
+                img = loaded[p]
+                if isinstance(img, (OSError, UnidentifiedImageError, DecompressionBombError)):
+                    print(f"  [{data_idx + 1}] 이미지 로드 실패: {p} ({img}) — 건너뜀")
+                elif isinstance(img, Exception):
+                    raise img
+                else:
+                    imgs.append(img)
 
             if not imgs:
                 print(f"  [{data_idx + 1}] 유효한 이미지가 없어 이미지 셀 비워둠")
@@ -587,14 +635,7 @@ def run(data, t_path: str, o_path: str):
                         ext = os.path.splitext(img.path)[1].lstrip('.').lower() or 'png'
                         bid = f'image{bin_counter}'
                         bin_counter += 1
-
-                        try:
-                            with open(img.path, 'rb') as f:
-                                new_binaries[f'BinData/{bid}.{ext}'] = f.read()
-                        except OSError as e:
-                            print(f"  [{data_idx + 1}] 이미지 읽기 실패: {img.path} ({e}) — 건너뜀")
-                            bin_counter -= 1
-                            continue
+                        new_binaries[f'BinData/{bid}.{ext}'] = img.data
 
                         disp_w = round(item.size[0] * HWP_PER_MM)
                         disp_h = round(item.size[1] * HWP_PER_MM)
@@ -614,38 +655,41 @@ def run(data, t_path: str, o_path: str):
         tbl_elem, z = _build_table(title, img_rows, z, params, next_id)
 
         # hp:p > hp:run > hp:tbl 구조로 래핑 (템플릿 패턴과 동일)
-        p_wrap = etree.Element(f'{{{HP}}}p', {
+        p_wrap = etree.Element(_P, {
             'id': str(next_id()), 'paraPrIDRef': params.wrap_para_pr, 'styleIDRef': '0',
             'pageBreak': '0', 'columnBreak': '0', 'merged': '0',
         })
-        run_wrap = etree.SubElement(p_wrap, f'{{{HP}}}run', {'charPrIDRef': params.wrap_char_pr})
+        run_wrap = etree.SubElement(p_wrap, _RUN, {'charPrIDRef': params.wrap_char_pr})
         run_wrap.append(tbl_elem)
-        etree.SubElement(run_wrap, f'{{{HP}}}t')
-        lsa = etree.SubElement(p_wrap, f'{{{HP}}}linesegarray')
-        etree.SubElement(lsa, f'{{{HP}}}lineseg', params.wrap_lineseg)
+        etree.SubElement(run_wrap, _T)
+        lsa = etree.SubElement(p_wrap, _LINESEGARRAY)
+        etree.SubElement(lsa, _LINESEG, params.wrap_lineseg)
 
-        root.insert(insert_idx, p_wrap)
-        insert_idx += 1
+        if anchor is not None:
+            anchor.addprevious(p_wrap)
+        else:
+            root.append(p_wrap)
 
-    # 7. XML 직렬화
-    zip_files[SEC_KEY] = etree.tostring(
-        root, xml_declaration=True, encoding='UTF-8', standalone=True,
-    )
-    for path, content in new_binaries.items():
-        zip_files[path] = content
+    # 7. XML 직렬화 — 수정한 항목만 덮어쓰기 목록에 담는다
+    #    XML 선언의 standalone은 템플릿 원본 선언을 그대로 따른다
+    overrides = {
+        SEC_KEY: etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=standalone),
+    }
 
     # 8. content.hpf 매니페스트에 신규 이미지 등록
     if new_binaries:
-        zip_files[HPF_KEY] = _update_content_hpf(zip_files[HPF_KEY], new_binaries)
+        overrides[HPF_KEY] = _update_content_hpf(hpf_bytes, new_binaries)
 
-    # 9. HWPX 패킹 (원본 ZipInfo 재사용 → 타임스탬프·외부속성 보존)
+    # 9. HWPX 패킹
     os.makedirs(os.path.dirname(o_path) or '.', exist_ok=True)
-    with zipfile.ZipFile(o_path, 'w', zipfile.ZIP_DEFLATED) as zout:
-        for name, content in zip_files.items():
-            orig = zip_infos.get(name)
-            if orig:
-                zout.writestr(orig, content)
-            else:
-                zout.writestr(name, content, compress_type=zipfile.ZIP_DEFLATED)
+    # 같은 디렉터리의 임시 파일에 끝까지 쓴 뒤 교체 → 도중에 실패해도 깨진 HWPX가 남지 않음
+    tmp_path = f'{o_path}.tmp'
+    try:
+        _write_hwpx(t_path, tmp_path, overrides, new_binaries)
+        os.replace(tmp_path, o_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
     print(f"HWPX 생성 완료: {o_path}")
\ No newline at end of file
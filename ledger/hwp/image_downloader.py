@@ -1,10 +1,16 @@
 import os
 import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from common.google_drive import _extract_drive_file_id
+from common.google_drive import _download_request_to_file, _extract_drive_file_id
 
 load_dotenv()
 _GOOGLE_SECRET_JSON = os.getenv('GOOGLE_SERVICE_ACCOUNT_JSON') or os.getenv('GOOGLE_SECRET_JSON')
@@ -24,13 +30,48 @@ _credentials = service_account.Credentials.from_service_account_file(
 _docs_service = build('docs', 'v1', credentials=_credentials)
 _drive_service = build('drive', 'v3', credentials=_credentials)
 
+_DOWNLOAD_WORKERS = 8   # 이미지 동시 다운로드 스레드 수
+_BATCH_LIMIT = 100      # Drive 배치 요청 1회당 최대 호출 수
+_CHUNK_SIZE = 4 * 1024 * 1024  # 이미지 스트리밍 다운로드 청크 크기 (Drive는 청크마다 HTTP 요청 1회)
+_thread_local = threading.local()
+_ROW_FILE_RE = re.compile(r'^row_(\d+)_')  # 캐시 파일명: row_{행 번호}_...
+
+# Drive 외 이미지 URL용 공유 세션 (연결 재사용으로 요청마다 TCP/TLS 핸드셰이크 생략)
+_HTTP_TIMEOUT = (5, 30)  # (연결, 읽기) 초
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=_DOWNLOAD_WORKERS,
+    pool_maxsize=_DOWNLOAD_WORKERS * 2,
+    max_retries=Retry(total=3, backoff_factor=0.3),
+))
+
+
+def _thread_drive_service():
+    """스레드별 Drive 서비스 (httplib2 연결은 스레드 간에 공유할 수 없음)"""
+    service = getattr(_thread_local, 'drive_service', None)
+    if service is None:
+        service = _thread_local.drive_service = build('drive', 'v3', credentials=_credentials)
+    return service
+
+@lru_cache(maxsize=None)
+def _fetch_doc(doc_id):
+    """Docs API 문서 조회 (여러 행이 같은 문서를 가리켜도 한 번만 요청)"""
+    return _docs_service.documents().get(documentId=doc_id).execute()
+
+
+@lru_cache(maxsize=None)
+def _drive_mime_type(file_id):
+    """Drive 파일 MIME 타입 조회 (같은 링크 반복 시 한 번만 요청)"""
+    return _drive_service.files().get(fileId=file_id, fields='mimeType').execute().get('mimeType', '')
+
+
 def _get_urls_from_doc(doc_id, tx_amount=None):
     """Google Docs API로 문서에서 이미지 URL 추출 및 이체 수수료 여부 확인.
 
     tx_amount: 거래 금액 절댓값 (원) — 영수증 금액 비교를 통한 수수료 감지용
     반환: (urls, has_transfer_fee)
     """
-    doc = _docs_service.documents().get(documentId=doc_id).execute()
+    doc = _fetch_doc(doc_id)
     urls = []
     has_transfer_fee = False
     max_krw = None
@@ -91,7 +132,7 @@ def _get_urls(url, tx_amount=None):
 
     # Drive 직접 링크인 경우 MIME 타입 확인
     if file_id and 'docs.google.com' not in url:
-        mime = _drive_service.files().get(fileId=file_id, fields='mimeType').execute().get('mimeType', '')
+        mime = _drive_mime_type(file_id)
         if mime == 'application/vnd.google-apps.document':
             return _get_urls_from_doc(file_id, tx_amount=tx_amount)
         return [url], False  # 이미지 등 바이너리 파일
@@ -99,77 +140,124 @@ def _get_urls(url, tx_amount=None):
     if not file_id: return [], False
     return _get_urls_from_doc(file_id, tx_amount=tx_amount)
 
-def _download(urls, dir, prefix):
-    """Google Drive API로 고화질 다운로드"""
-    paths = []
-    for i, url in enumerate(urls):
-        # Drive 파일 ID 추출
-        file_id = None
-        if '/d/' in url:
-            file_id = url.split('/d/')[1].split('/')[0]
-        elif 'id=' in url:
-            file_id = parse_qs(urlparse(url).query).get('id', [None])[0]
-        
-        ext, content = None, None
-        if file_id:
-            file_info = _drive_service.files().get(fileId=file_id).execute()
-            file_name = file_info.get('name', 'image.png')
-            ext = file_name.split('.')[-1]
-            
-            content = _drive_service.files().get_media(fileId=file_id).execute()
+def _fetch_file_names(file_ids):
+    """Drive 파일 이름을 배치 요청으로 한 번에 조회: {file_id: name}"""
+    names = {}
+    errors = []
+
+    def _on_response(request_id, response, exception):
+        if exception is not None:
+            errors.append(exception)
         else:
-            res = requests.get(url, allow_redirects=True)
-            if res.status_code != 200: continue
+            names[request_id] = response.get('name', 'image.png')
+
+    unique_ids = list(dict.fromkeys(file_ids))
+    for start in range(0, len(unique_ids), _BATCH_LIMIT):
+        batch = _drive_service.new_batch_http_request(callback=_on_response)
+        for file_id in unique_ids[start:start + _BATCH_LIMIT]:
+            batch.add(_drive_service.files().get(fileId=file_id, fields='name'), request_id=file_id)
+        batch.execute()
+
+    if errors:
+        raise errors[0]
+    return names
+
+
+def _download_one(url, file_id, file_name, path_stem):
+    """이미지 1개를 메모리에 모으지 않고 path_stem.{확장자}로 스트리밍 저장. 실패 시 None."""
+    if file_id:
+        ext = file_name.split('.')[-1]
+        if not ext: return None
+        path = f'{path_stem}.{ext}'
+        request = _thread_drive_service().files().get_media(fileId=file_id)
+        _download_request_to_file(request, path, chunksize=_CHUNK_SIZE)
+    else:
+        with _session.get(url, allow_redirects=True, stream=True, timeout=_HTTP_TIMEOUT) as res:
+            if res.status_code != 200: return None
             ext = res.headers.get('Content-Type', 'image/png').split('/')[-1]
-            content = res.content
-        
-        if not ext or not content: continue
-
-        path = os.path.join(dir, f'{prefix}_{i}.{ext}')
-        
-        with open(path, 'wb') as f:
-            f.write(content)
-        paths.append(path)
-    
-    return paths
+            if not ext: return None
+            path = f'{path_stem}.{ext}'
+            try:
+                with open(path, 'wb') as f:
+                    for chunk in res.iter_content(chunk_size=_CHUNK_SIZE):
+                        f.write(chunk)
+            except Exception:
+                # 중간에 끊긴 파일이 남으면 다음 실행에서 캐시로 오인되므로 삭제
+                if os.path.exists(path):
+                    os.unlink(path)
+                raise
+
+    # 내용이 비어 있으면 (기존과 동일하게) 결과에서 제외
+    if os.path.getsize(path) == 0:
+        os.unlink(path)
+        return None
+    return path
+
+
+def _download(urls, dir, prefix, executor):
+    """Google Drive API로 고화질 다운로드 (메타데이터는 배치 조회, 본문은 병렬 다운로드)
+
+    executor: run()에서 전체 행이 공유하는 다운로드 스레드 풀
+    """
+    file_ids = [_extract_drive_file_id(url) for url in urls]
+
+    names = _fetch_file_names([file_id for file_id in file_ids if file_id])
+
+    paths = list(executor.map(
+        lambda i: _download_one(
+            urls[i], file_ids[i], names.get(file_ids[i]), os.path.join(dir, f'{prefix}_{i}'),
+        ),
+        range(len(urls)),
+    ))
+
+    return [path for path in paths if path]
 
 def run(data, img_dir):
     os.makedirs(img_dir, exist_ok=True)
-    all_files = os.listdir(img_dir)
+
+    # 캐시 파일을 행 번호별로 한 번에 묶어 둔다 (행마다 전체 목록을 다시 훑지 않음)
+    files_by_row = defaultdict(list)
+    for f in os.listdir(img_dir):
+        m = _ROW_FILE_RE.match(f)
+        if m:
+            files_by_row[int(m.group(1))].append(f)
+
     img_paths_list = []
     has_fee_list = []
 
-    for idx, row in data.iterrows():
-        prefix = f"row_{idx + 1}_"
-        fee_filename = f'{prefix}fee'
-        fee_file = os.path.join(img_dir, fee_filename)
-
-        # 이미지 파일만 캐시 목록에 포함 (fee 파일 제외)
-        cached = sorted([
-            os.path.join(img_dir, f) for f in all_files
-            if f.startswith(prefix) and f != fee_filename
-        ])
-
-        if cached and os.path.exists(fee_file):
-            # 이미지 + 이체 수수료 모두 캐시된 경우
-            img_paths_list.append(cached)
-            with open(fee_file) as f:
-                has_fee = f.read().strip() == '1'
-        else:
-            link = row['링크']
-            tx_amount = abs(int(row['입/출']))
-            urls, has_fee = _get_urls(link, tx_amount=tx_amount) if isinstance(link, str) and link.strip() else ([], False)
+    # 스레드 풀은 전체 행에서 공유 (스레드별 Drive 클라이언트를 행마다 다시 만들지 않음)
+    with ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as executor:
+        for idx, row in data.iterrows():
+            prefix = f"row_{idx + 1}_"
+            fee_filename = f'{prefix}fee'
+            fee_file = os.path.join(img_dir, fee_filename)
+
+            # 이미지 파일만 캐시 목록에 포함 (fee 파일 제외)
+            cached = sorted([
+                os.path.join(img_dir, f) for f in files_by_row.get(idx + 1, ())
+                if f != fee_filename
+            ])
 
-            if cached:
+            if cached and os.path.exists(fee_file):
+                # 이미지 + 이체 수수료 모두 캐시된 경우
                 img_paths_list.append(cached)
+                with open(fee_file) as f:
+                    has_fee = f.read().strip() == '1'
             else:
-                paths = _download(urls, img_dir, prefix=prefix)
-                img_paths_list.append(paths)
+                link = row['링크']
+                tx_amount = abs(int(row['입/출']))
+                urls, has_fee = _get_urls(link, tx_amount=tx_amount) if isinstance(link, str) and link.strip() else ([], False)
+
+                if cached:
+                    img_paths_list.append(cached)
+                else:
+                    paths = _download(urls, img_dir, prefix=prefix, executor=executor)
+                    img_paths_list.append(paths)
 
-            with open(fee_file, 'w') as f:
-                f.write('1' if has_fee else '0')
+                with open(fee_file, 'w') as f:
+                    f.write('1' if has_fee else '0')
 
-        has_fee_list.append(has_fee)
+            has_fee_list.append(has_fee)
 
     data['img_paths'] = img_paths_list
     data['이체수수료'] = has_fee_list
@@ -1,11 +1,65 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
 from math import ceil
+from statistics import median_high
 from PIL import Image, ImageOps
 
+_EXIF_ORIENTATION = 0x0112
+_DEFAULT_DPI = 96.0  # DPI 정보가 없을 때 가정값 (pyhwpx 기본값)
+
+def _dpi(info: dict) -> tuple[float, float]:
+    """PIL info의 dpi 값을 (x, y)로 정규화. 없거나 0이면 96 DPI"""
+    raw = info.get('dpi')
+    if isinstance(raw, (tuple, list)) and len(raw) >= 2:
+        try:
+            return float(raw[0]) or _DEFAULT_DPI, float(raw[1]) or _DEFAULT_DPI
+        except (TypeError, ValueError):
+            pass
+    return _DEFAULT_DPI, _DEFAULT_DPI
+
 class Img:
-    def __init__(self, path: str):
+    def __init__(self, path: str, data: bytes | None = None):
+        """data: 이미 읽어 둔 파일 바이트 (주면 디스크를 다시 읽지 않고 self.data로 보관)"""
         self.path = path
-        ImageOps.exif_transpose(Image.open(path)).save(path, exif=b"")
-        self.w, self.h = Image.open(self.path).size
+        self.data = data
+        with Image.open(io.BytesIO(data) if data is not None else path) as im:
+            # 예전에는 모든 이미지를 다시 저장하면서 DPI 태그가 지워져 96 DPI로 들어갔다.
+            # 다시 저장하지 않는 이미지도 같은 물리 크기가 되도록 원본 DPI 태그는 쓰지 않는다
+            self.dpi = (_DEFAULT_DPI, _DEFAULT_DPI)
+            # 회전 정보가 있을 때만 원본을 회전해 다시 저장 (이미 정방향이면 디코딩/재인코딩 생략)
+            if im.getexif().get(_EXIF_ORIENTATION, 1) != 1:
+                im = ImageOps.exif_transpose(im)
+                im.save(path, exif=b"")
+                if data is not None:
+                    with open(path, 'rb') as f:
+                        self.data = f.read()
+                # 다시 저장한 파일에는 원본 DPI가 남지 않으므로, 다음 실행과 같은 값이 되도록 저장본에서 읽는다
+                with Image.open(io.BytesIO(self.data) if self.data is not None else path) as saved:
+                    self.dpi = _dpi(saved.info)
+            self.w, self.h = im.size
+
+def _load_imgs(paths, max_workers=None, read_data=False) -> dict:
+    """경로별 Img를 스레드 풀에서 미리 로드: {path: Img 또는 로드 중 발생한 예외}
+
+    PIL 디코딩/EXIF 회전 저장은 GIL을 놓으므로 병렬로 겹쳐 실행된다.
+    같은 경로는 한 번만 처리한다 (회전 저장이 동시에 같은 파일을 쓰지 않도록).
+    read_data=True면 파일 바이트를 한 번 읽어 Img.data로 함께 보관한다.
+    """
+    def _load(path):
+        try:
+            if not read_data:
+                return Img(path)
+            with open(path, 'rb') as f:
+                return Img(path, f.read())
+        except Exception as e:
+            return e
+
+    unique_paths = list(dict.fromkeys(paths))
+    if not unique_paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return dict(zip(unique_paths, executor.map(_load, unique_paths)))
 
 class LayoutItem:
     def __init__(
@@ -29,33 +83,39 @@ class LayoutResult:
         self.items = items or []    # 개별 이미지 정보 리스트
         self.grid = grid            # 그리드 구조 (행, 열)
 
+def _fit_scales(imgs: list[Img], cw: float, ch: float, cols: int) -> tuple[float, list[float]]:
+    """cols열 그리드에서 이미지별 배율과 총 면적 계산 (LayoutItem 생성 없이 점수만)"""
+    n = len(imgs)
+    rows = ceil(n / cols)
+    cell_w, cell_h = cw / cols, ch / rows
+
+    # 모든 이미지의 최대 스케일 계산
+    fits = [min(cell_w / img.w, cell_h / img.h) for img in imgs]
+
+    # 짝수 개일 때는 가운데 두 값 중 큰 값(상위 중앙값)을 기준으로 삼는다 (sorted(fits)[n // 2]와 동일)
+    median_scale = median_high(fits)
+
+    scales = [min(median_scale, fit) for fit in fits]
+    area = sum((img.w * s) * (img.h * s) for img, s in zip(imgs, scales))
+    return area, scales
+
+
 def _layout(imgs: list[Img], cw: float, ch: float) -> LayoutResult | None:
     n = len(imgs)
     if n == 0: return None
-    
-    best = LayoutResult()
-    
+
+    best_area, best_cols, best_scales = -1, 0, []
     for cols in range(1, min(n + 1, 6)):
-        rows = ceil(n / cols)
-        cell_w, cell_h = cw / cols, ch / rows
-        
-        # 모든 이미지의 최대 스케일 계산
-        scales = [min(cell_w / img.w, cell_h / img.h) for img in imgs]
-        
-        median_scale = sorted(scales)[n // 2]
-        
-        items = []
-        for i, img in enumerate(imgs):
-            scale = min(median_scale, cell_w / img.w, cell_h / img.h)
-            w, h = img.w * scale, img.h * scale
-            x, y = (i % cols) * cell_w, (i // cols) * cell_h
-            items.append(LayoutItem(i, img.path, (w, h)))
-        
-        area = sum(item.size[0] * item.size[1] for item in items)
-        if len(items) == n and area > best.area:
-            best = LayoutResult(area, items, (rows, cols))
-    
-    return best if len(best.items) == n else None
+        area, scales = _fit_scales(imgs, cw, ch, cols)
+        if area > best_area:
+            best_area, best_cols, best_scales = area, cols, scales
+
+    # 가장 넓은 배치 하나만 LayoutItem으로 만든다
+    items = [
+        LayoutItem(i, img.path, (img.w * s, img.h * s))
+        for i, (img, s) in enumerate(zip(imgs, best_scales))
+    ]
+    return LayoutResult(best_area, items, (ceil(n / best_cols), best_cols))
 
 
 def _get_cell(hwp):
@@ -89,11 +149,15 @@ def _pack(hwp, layout: LayoutResult):
             hwp.BreakPara()
 
 
-def pack(hwp, paths):
+def pack(hwp, paths, cell_size=None, imgs=None):
+    """cell_size: (너비, 높이) mm. 같은 템플릿 표를 반복할 때 넘기면 셀 크기 조회(COM 호출) 생략
+    imgs: 미리 로드한 Img 목록 (없으면 paths에서 직접 로드)
+    """
     if not hwp.ParentCtrl or hwp.ParentCtrl.CtrlID != 'tbl': return False
-    cw, ch = _get_cell(hwp)
+    cw, ch = cell_size or _get_cell(hwp)
 
-    imgs = [Img(path) for path in paths]
+    if imgs is None:
+        imgs = [Img(path) for path in paths]
     if not imgs: return False
     
     layout = _layout(imgs, cw, ch)
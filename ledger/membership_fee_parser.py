@@ -1,18 +1,22 @@
 import re
 import argparse
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
 import pandas as pd
 import openpyxl
 from openpyxl.styles import Font
+from openpyxl.utils import column_index_from_string
+from common.xlsx_reader import _NS_MAIN, _NS_REL, _read_rels, _read_sheet_values, _sheet_xml_paths
 
 TEMPLATE_PATH = 'templates/ledger_format.xlsx'
 SOURCE_HEADER_ROW = 1   # 0-indexed: row 2 in Excel
 SOURCE_COLS = 'C:I'     # 월, 날짜, 내용, 이름, 비고, 입/출, 잔액
+LINK_COL = 'E'          # 내용 열 (하이퍼링크 / =HYPERLINK 수식)
 
-
-def _ym_from_date(date_str):
-    """날짜 문자열에서 YYYYMM 정수 추출: '2025.11.01 ...' -> 202511"""
-    m = re.match(r'(\d{4})\.(\d{2})\.', str(date_str))
-    return int(m.group(1)) * 100 + int(m.group(2)) if m else None
+_HYPERLINK_FORMULA_RE = re.compile(r'^=?HYPERLINK\("([^"]+)"', re.IGNORECASE)
+_CELL_REF_RE = re.compile(r'^([A-Z]+)(\d+)$')
+_DATE_PREFIX_RE = re.compile(r'\d{4}\.\d{2}\.\d{2}')
 
 
 def _parse_period(ym_str):
@@ -23,38 +27,100 @@ def _parse_period(ym_str):
     return int(m.group(1)) * 100 + int(m.group(2))
 
 
-def parse_source(file_path):
-    all_sheets = pd.read_excel(
-        file_path, sheet_name=None, header=SOURCE_HEADER_ROW, usecols=SOURCE_COLS
+def _scan_sheet_links(zf, sheet_path, min_row):
+    """워크시트 XML을 한 번 스캔해 LINK_COL 열의 {행 번호(1-based): 링크} 반환.
+
+    하이퍼링크 관계(<hyperlink r:id>)가 =HYPERLINK("url", ...) 수식보다 우선한다.
+    """
+    formula_links = {}
+    hyperlink_rids = {}
+
+    with zf.open(sheet_path) as f:
+        for _, elem in ET.iterparse(f):
+            tag = elem.tag
+            if tag == f'{{{_NS_MAIN}}}c':
+                m = _CELL_REF_RE.match(elem.get('r', ''))
+                if m and m.group(1) == LINK_COL and int(m.group(2)) >= min_row:
+                    formula = elem.find(f'{{{_NS_MAIN}}}f')
+                    fm = _HYPERLINK_FORMULA_RE.match(formula.text or '') if formula is not None else None
+                    if fm:
+                        formula_links[int(m.group(2))] = fm.group(1)
+            elif tag == f'{{{_NS_MAIN}}}row':
+                elem.clear()
+            elif tag == f'{{{_NS_MAIN}}}hyperlink':
+                rid = elem.get(f'{{{_NS_REL}}}id')
+                if not rid:
+                    continue
+                # ref는 단일 셀("E3") 또는 범위("E3:E5")
+                start, _, end = elem.get('ref', '').partition(':')
+                sm, em = _CELL_REF_RE.match(start), _CELL_REF_RE.match(end or start)
+                if not sm or not em or not (
+                    column_index_from_string(sm.group(1))
+                    <= column_index_from_string(LINK_COL)
+                    <= column_index_from_string(em.group(1))
+                ):
+                    continue
+                for row in range(int(sm.group(2)), int(em.group(2)) + 1):
+                    if row >= min_row:
+                        hyperlink_rids[row] = rid
+
+    if hyperlink_rids:
+        rels_path = posixpath.join(
+            posixpath.dirname(sheet_path), '_rels', posixpath.basename(sheet_path) + '.rels'
+        )
+        sheet_rels = _read_rels(zf, rels_path)
+        for row, rid in hyperlink_rids.items():
+            target = sheet_rels.get(rid)
+            if target:
+                formula_links[row] = target
+    return formula_links
+
+
+def _read_links(file_path, sheet_names, min_row):
+    """xlsx를 ZIP으로 열어 시트별 {행 번호: 링크} 반환 (Workbook 객체 생성 없음)."""
+    with zipfile.ZipFile(file_path) as zf:
+        sheet_paths = _sheet_xml_paths(zf)
+        return {
+            name: _scan_sheet_links(zf, sheet_paths[name], min_row)
+            for name in sheet_names if name in sheet_paths
+        }
+
+
+def _read_year_sheets(file_path, year_pattern):
+    """연도별 시트의 SOURCE_COLS 값을 {시트 이름: DataFrame}으로 반환.
+
+    워크북을 한 번만 열어 필요한 시트·열만 값 튜플로 읽는다.
+    """
+    min_col, max_col = (column_index_from_string(c) for c in SOURCE_COLS.split(':'))
+    values = _read_sheet_values(
+        file_path, year_pattern.match,
+        min_row=SOURCE_HEADER_ROW + 1, min_col=min_col, max_col=max_col,
     )
-    year_pattern = re.compile(r'^\d{4}년$')
-    # data_only=False: 수식 문자열 그대로 읽어 =HYPERLINK("url","text") 파싱
-    wb = openpyxl.load_workbook(file_path, data_only=False)
-
-    frames = []
-    for name, df in all_sheets.items():
-        if not year_pattern.match(name):
+    sheets = {}
+    for name, rows in values.items():
+        if not rows:
             continue
+        header, data = rows[0], rows[1:]
+        columns = [str(h) if h is not None else f'Unnamed: {i}' for i, h in enumerate(header)]
+        # 빈 셀(None)은 pd.read_excel과 동일하게 NaN으로 통일
+        sheets[name] = pd.DataFrame.from_records(data, columns=columns).replace({None: float('nan')})
+    return sheets
 
-        if '날짜' not in df.columns:
-            continue
 
-        ws = wb[name]
-        data_start_row = SOURCE_HEADER_ROW + 2  # 1-indexed: header=row2, data=row3
-
-        links = []
-        for row in ws.iter_rows(min_row=data_start_row):
-            content_cell = row[4]    # E열(내용)
-            if content_cell.hyperlink:
-                link = content_cell.hyperlink.target
-            elif isinstance(content_cell.value, str):
-                m = re.match(r'=HYPERLINK\("([^"]+)"', content_cell.value, re.IGNORECASE)
-                link = m.group(1) if m else None
-            else:
-                link = None
-            links.append(link)
-
-        df['링크'] = links[:len(df)]
+def parse_source(file_path):
+    year_pattern = re.compile(r'^\d{4}년$')
+    year_sheets = {
+        name: df for name, df in _read_year_sheets(file_path, year_pattern).items()
+        if '날짜' in df.columns
+    }
+    data_start_row = SOURCE_HEADER_ROW + 2  # 1-indexed: header=row2, data=row3
+    # 수식 문자열(=HYPERLINK("url","text"))과 하이퍼링크를 XML에서 직접 읽음
+    links_by_sheet = _read_links(file_path, year_sheets, data_start_row)
+
+    frames = []
+    for name, df in year_sheets.items():
+        links = links_by_sheet.get(name, {})
+        df['링크'] = [links.get(data_start_row + i) for i in range(len(df))]
         df_clean = df.dropna(subset=['날짜']).reset_index(drop=True)
         frames.append(df_clean)
 
@@ -65,7 +131,9 @@ def parse_source(file_path):
 
 def filter_by_period(df, start_ym, end_ym):
     """YYYYMM 범위로 필터링 후 날짜순 정렬"""
-    yms = df['날짜'].apply(_ym_from_date)
+    # 날짜 문자열의 'YYYY.MM.' 접두만 한 번에 파싱 ('2025.11.01 ...' -> 202511, 형식이 다르면 NaN → 제외)
+    months = pd.to_datetime(df['날짜'].astype(str).str.slice(0, 8), format='%Y.%m.', errors='coerce')
+    yms = months.dt.year * 100 + months.dt.month
     filtered = df[(yms >= start_ym) & (yms <= end_ym)].copy()
     filtered = filtered.sort_values('날짜').reset_index(drop=True)
     return filtered
@@ -74,7 +142,8 @@ def filter_by_period(df, start_ym, end_ym):
 def _clear_data_rows(ws, data_start_row):
     for row in ws.iter_rows(min_row=data_start_row, max_row=ws.max_row):
         for cell in row:
-            cell.value = None
+            if cell.value is not None:
+                cell.value = None
 
 
 def write_to_ledger(df, template_path, output_path, start_ym, end_ym):
@@ -94,20 +163,30 @@ def write_to_ledger(df, template_path, output_path, start_ym, end_ym):
     DATA_START_ROW = 8
     _clear_data_rows(ws, DATA_START_ROW)
 
-    for i, row in df.iterrows():
+    # Font는 불변 스타일이므로 두 개만 만들어 모든 셀에 공유
+    income_font = Font(color='000000')
+    expense_font = Font(color='FF0000')
+
+    # 입/출 부호에서 나오는 값은 열 단위로 한 번에 계산 (행마다 Series를 만들지 않음)
+    amounts = df['입/출']
+    incomes = (amounts > 0).tolist()
+    abs_amounts = amounts.abs().tolist()
+    dates = [_DATE_PREFIX_RE.match(str(d)).group() for d in df['날짜']]
+    contents = [str(c) for c in df['내용']]
+    rows = zip(df.index.tolist(), incomes, dates, contents, abs_amounts, df['잔액'].tolist())
+
+    for i, is_income, date, content, abs_amount, balance in rows:
         excel_row = DATA_START_ROW + i
-        amount = row['입/출']
-        is_income = amount > 0
         종류 = '입금' if is_income else '출금'
-        font = Font(color='000000') if is_income else Font(color='FF0000')
+        font = income_font if is_income else expense_font
 
         cells = [
             ws.cell(row=excel_row, column=2, value=i + 1),
-            ws.cell(row=excel_row, column=3, value=re.match(r'\d{4}\.\d{2}\.\d{2}', str(row['날짜'])).group()),
+            ws.cell(row=excel_row, column=3, value=date),
             ws.cell(row=excel_row, column=4, value=종류),
-            ws.cell(row=excel_row, column=5, value=str(row['내용'])),
-            ws.cell(row=excel_row, column=6, value=abs(amount)),
-            ws.cell(row=excel_row, column=7, value=row['잔액']),
+            ws.cell(row=excel_row, column=5, value=content),
+            ws.cell(row=excel_row, column=6, value=abs_amount),
+            ws.cell(row=excel_row, column=7, value=balance),
         ]
         for cell in cells:
             cell.font = font
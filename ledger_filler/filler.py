@@ -51,6 +51,9 @@ _L_DESC    = get_column_letter(COL_DESC)    # E
 _L_NOTE    = get_column_letter(COL_NOTE)    # G
 _L_AMOUNT  = get_column_letter(COL_AMOUNT)  # H
 
+# 거래내역 파일명: 신한_거래내역_YYMM.xlsx (접두 고정 → 이름 내림차순 = 기간 내림차순)
+_TRANSACTION_FILE_RE = re.compile(r'^신한_거래내역_(\d{4})\.xlsx$')
+
 
 # ============================================================================
 # Google Auth
@@ -136,14 +139,18 @@ def download_sheet_as_xlsx(url):
 
 
 def _find_latest_transaction_in_folder(drive, folder_id):
-    """폴더 내 신한_거래내역_YYMM.xlsx 파일 중 가장 최신 파일의 (file_id, name) 반환."""
-    pattern = re.compile(r'신한_거래내역_(\d{4})\.xlsx$')
-    files = []
+    """폴더 내 신한_거래내역_YYMM.xlsx 파일 중 가장 최신 파일의 (file_id, name) 반환.
+
+    Drive에 이름 내림차순 정렬을 요청하므로 (YYMM은 고정 4자리 → 이름순 = 기간순)
+    처음 발견한 유효한 파일이 최신이며, 이후 페이지는 받지 않는다.
+    """
     page_token = None
     while True:
         kwargs = dict(
             q=f"'{folder_id}' in parents and mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' and trashed=false",
             fields='nextPageToken, files(id, name)',
+            orderBy='name desc',
+            pageSize=1000,
             supportsAllDrives=True,
             includeItemsFromAllDrives=True,
         )
@@ -151,19 +158,13 @@ def _find_latest_transaction_in_folder(drive, folder_id):
             kwargs['pageToken'] = page_token
         result = drive.files().list(**kwargs).execute()
         for f in result.get('files', []):
-            m = pattern.search(f['name'])
-            if m:
-                s = m.group(1)
-                if 1 <= int(s[2:]) <= 12:
-                    files.append((int(s), f['name'], f['id']))
+            m = _TRANSACTION_FILE_RE.match(f['name'])
+            if m and 1 <= int(m.group(1)[2:]) <= 12:
+                return f['id'], f['name']
         page_token = result.get('nextPageToken')
         if not page_token:
             break
-    if not files:
-        raise FileNotFoundError("폴더에서 신한_거래내역_YYMM.xlsx 파일을 찾을 수 없습니다.")
-    files.sort(key=lambda x: x[0])
-    _, name, file_id = files[-1]
-    return file_id, name
+    raise FileNotFoundError("폴더에서 신한_거래내역_YYMM.xlsx 파일을 찾을 수 없습니다.")
 
 
 def download_transaction_from_drive(url):
@@ -188,6 +189,19 @@ def download_transaction_from_drive(url):
 # Parsing
 # ============================================================================
 
+def _to_number(value):
+    """입금/출금 셀 값을 float로 변환. 빈 값·숫자가 아닌 문자열은 0.0"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        raw = value.replace(',', '').strip()
+        try:
+            return float(raw) if raw else 0.0
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
 def parse_transaction_file(filepath):
     """
     거래내역 엑셀 파일 파싱.
@@ -196,32 +210,26 @@ def parse_transaction_file(filepath):
         list of (date_str, amount, name, balance)
         - amount: 입금이면 양수, 출금이면 음수
     """
-    wb = openpyxl.load_workbook(filepath, data_only=True)
+    # 한 번 훑어 읽기만 하므로 read_only 스트리밍 모드로 연다 (워크북 모델을 메모리에 만들지 않음)
+    wb = openpyxl.load_workbook(filepath, data_only=True, read_only=True)
     try:
         ws = wb.active
         if ws is None:
             return []
+        # 은행 내보내기 파일의 dimension 정보가 틀려도 모든 행을 읽도록 저장된 범위를 무시
+        ws.reset_dimensions()
         transactions = []
+        to_number = _to_number  # 행 루프에서 지역 변수로 조회
 
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in ws.iter_rows(min_row=2, max_col=6, values_only=True):
             if len(row) < 6:
                 continue
             no, date_str, deposit, withdrawal, name, balance = row[:6]
             if no is None:
                 continue
-            def _to_number(value):
-                if isinstance(value, (int, float)):
-                    return float(value)
-                if isinstance(value, str):
-                    raw = value.replace(',', '').strip()
-                    try:
-                        return float(raw) if raw else 0.0
-                    except ValueError:
-                        return 0.0
-                return 0.0
-
-            deposit = _to_number(deposit)
-            withdrawal = _to_number(withdrawal)
+
+            deposit = to_number(deposit)
+            withdrawal = to_number(withdrawal)
             if deposit > 0:
                 amount = deposit
             elif withdrawal > 0: